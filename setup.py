@@ -49,11 +49,11 @@ setup(name='ursine',
       keywords=['sip', 'voip', 'url'],
       url='https://github.com/sangoma/ursine',
       install_requires=install_requires,
-      python_requires='>=3.6',
+      python_requires='>=3.7',
       classifiers=[
           'Development Status :: 4 - Beta',
           'Programming Language :: Python :: 3 :: Only',
-          'Programming Language :: Python :: 3.6',
+          'Programming Language :: Python :: 3.7',
           'Topic :: Communications :: Telephony',
           'Topic :: Communications :: Internet Phone',
           'License :: OSI Approved :: Apache Software License',
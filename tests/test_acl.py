@@ -0,0 +1,79 @@
+import pytest
+from ursine import URI
+from ursine.acl import ACL, ACLError, ACLRule
+
+
+@pytest.fixture
+def acl():
+    return ACL([
+        ACLRule('*', None, None, 'any-domain'),
+        ACLRule('*.carrier.net', None, None, 'carrier'),
+        ACLRule('sbc.carrier.net', None, ['tls', 'tcp'], 'sbc'),
+        ACLRule('*.eu.carrier.net', ['sips'], None, 'eu-secure'),
+        ACLRule('10.0.0.0/8', None, None, 'private'),
+        ACLRule('10.1.2.0/24', None, ['udp'], 'lab'),
+        ACLRule('10.1.2.3', None, None, 'host'),
+        ACLRule('2001:db8::/32', None, None, 'doc'),
+        ACLRule('[2001:db8::1]', None, None, 'doc-host'),
+    ])
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:example.com', 'any-domain'),
+    ('sip:carrier.net', 'any-domain'),
+    ('sip:a.carrier.net', 'carrier'),
+    ('sip:a.b.Carrier.NET.', 'carrier'),
+    ('sip:sbc.carrier.net', 'carrier'),
+    ('sip:sbc.carrier.net;transport=tcp', 'sbc'),
+    ('sips:sbc.carrier.net', 'sbc'),
+    ('sip:x.eu.carrier.net', 'carrier'),
+    ('sips:x.eu.carrier.net', 'eu-secure'),
+    ('sip:10.200.0.1', 'private'),
+    ('sip:10.1.2.4', 'lab'),
+    ('sip:10.1.2.4;transport=tcp', 'private'),
+    ('sip:user@10.1.2.3:5080', 'host'),
+    ('sip:11.0.0.1', None),
+    ('sip:[2001:db8::2]', 'doc'),
+    ('sip:[2001:db8::1]:5060', 'doc-host'),
+    ('sip:[2001:db9::1]', None),
+])
+def test_match(acl, uri, expect):
+    assert acl.match(URI(uri)) == expect
+
+
+def test_no_domains():
+    acl = ACL(['example.com', '192.168.0.0/16'])
+    assert len(acl) == 2
+    assert URI('sip:example.com') in acl
+    assert URI('sip:a.example.com') not in acl
+    assert URI('sip:192.168.1.1') in acl
+    assert acl.match(URI('sip:other.com'), default=False) is False
+
+
+@pytest.mark.parametrize('pattern', [
+    'a.*.com',
+    'example..com',
+    '10.0.0.0/33',
+    '2001:db8::/200',
+])
+def test_invalid(pattern):
+    with pytest.raises(ACLError):
+        ACL([pattern])
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:alice@pbx.customer43210.example.com', 43210),
+    ('sip:alice@customer43210.example.com', None),
+    ('sip:alice@17.168.199.10:5060', 43207),
+    ('sip:alice@192.0.2.1', None),
+])
+def test_match_customers(uri, expect, benchmark):
+    # a wildcard domain and a /24 for each of 50k customers
+    acl = ACL(rule
+              for n in range(50_000)
+              for rule in (
+                  ACLRule(f'*.customer{n}.example.com', None, None, n),
+                  ACLRule(f'{10 + n % 100}.{n // 256 % 256}.{n % 256}.0/24',
+                          None, None, n),
+              ))
+    assert benchmark(acl.match, URI(uri)) == expect
@@ -0,0 +1,93 @@
+import pytest
+from ursine import URI
+from ursine.aor_index import AORIndex, AORIndexError, compile_index, main
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = str(tmp_path / 'aors.idx')
+    compile_index([
+        'sip:alice@example.com',
+        (URI('sip:bob:secret@Example.com;transport=tcp'), b'bob-data'),
+        ('sips:carol@example.com:5081', b'carol-data'),
+        ('sip:bob@example.com?x=y', b'bob-again'),
+    ], path)
+    return path
+
+
+def test_lookup(index_path):
+    with AORIndex(index_path) as index:
+        assert len(index) == 3
+        assert list(index.aors()) == [
+            'sip:alice@example.com',
+            'sip:bob@example.com',
+            'sips:carol@example.com:5081',
+        ]
+        assert URI('sip:alice@EXAMPLE.com;transport=tcp') in index
+        assert index.get(URI('sip:alice@example.com')) == b''
+        assert index.get(URI('sip:bob@example.com')) == b'bob-again'
+        assert index.get('sips:carol@example.com:5081') == b'carol-data'
+        assert URI('sips:alice@example.com') not in index
+        assert URI('sip:carol@example.com') not in index
+        assert index.get(URI('sip:dave@example.com'), b'none') == b'none'
+
+
+def test_recompile_while_open(index_path, tmp_path):
+    with AORIndex(index_path) as index:
+        compile_index([('sip:dave@example.com', b'dave-data')], index_path)
+        # the open index still sees the file it mapped
+        assert len(index) == 3
+        assert index.get('sip:bob@example.com') == b'bob-again'
+        assert 'sip:dave@example.com' not in index
+        with AORIndex(index_path) as rebuilt:
+            assert list(rebuilt.aors()) == ['sip:dave@example.com']
+            assert rebuilt.get('sip:dave@example.com') == b'dave-data'
+    assert [p.name for p in tmp_path.iterdir()] == ['aors.idx']
+
+
+def test_empty(tmp_path):
+    path = str(tmp_path / 'empty.idx')
+    assert compile_index([], path) == 0
+    with AORIndex(path) as index:
+        assert len(index) == 0
+        assert URI('sip:alice@example.com') not in index
+
+
+@pytest.mark.parametrize('contents', [
+    b'',
+    b'not an index at all',
+    b'URSAOR\x01<\xff\xff\x00\x00\x00\x00\x00\x00',
+])
+def test_invalid(tmp_path, contents):
+    path = tmp_path / 'bad.idx'
+    path.write_bytes(contents)
+    with pytest.raises(AORIndexError):
+        AORIndex(str(path))
+
+
+def test_main(tmp_path, capsys):
+    source = tmp_path / 'aors.txt'
+    source.write_text('# subscribers\n'
+                      'sip:alice@example.com\t1\n'
+                      'sip:bob@example.com\n')
+    path = str(tmp_path / 'aors.idx')
+    main([str(source), path])
+    assert 'wrote 2 AORs' in capsys.readouterr().out
+    with AORIndex(path) as index:
+        assert index.get(URI('sip:alice@example.com')) == b'1'
+
+
+@pytest.fixture(scope='module')
+def large_index(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('aor') / 'large.idx')
+    uri = URI('sip:user@example.com')
+    compile_index(((uri.with_user(f'user{n}'), str(n).encode())
+                   for n in range(200_000)), path)
+    index = AORIndex(path)
+    yield index
+    index.close()
+
+
+def test_lookup_large(large_index, benchmark):
+    uri = URI('sip:user123456@example.com;transport=tcp')
+    assert benchmark(large_index.get, uri) == b'123456'
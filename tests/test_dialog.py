@@ -0,0 +1,102 @@
+import pytest
+from ursine import Header, URI
+from ursine.dialog import DialogTable, DialogError, DialogID
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+alice = Header('"Alice" <sip:alice@localhost>;tag=a1')
+bob = Header('"Bob" <sip:bob@localhost>;tag=b1')
+bob_fork = Header('"Bob" <sip:bob@localhost>;tag=b2')
+
+
+def test_match_both_directions():
+    table = DialogTable()
+    dialog = table.add('call-1', alice, bob)
+    # a request we send and a request we receive
+    assert table.match('call-1', alice, bob) is dialog
+    assert table.match('call-1', bob, alice) is dialog
+    assert table.match('call-2', alice, bob) is None
+    assert table.match('call-1', alice, bob_fork) is None
+
+
+def test_early_forks():
+    table = DialogTable()
+    table.add('call-1', alice, bob)
+    table.add('call-1', alice, bob_fork)
+    assert len(table) == 2
+    assert {d.remote.tag for d in table.forks('call-1', 'a1')} == {'b1', 'b2'}
+    assert all(d.early for d in table.forks('call-1', 'a1'))
+
+    dialog = table.confirm(DialogID('call-1', 'a1', 'b2'), drop_forks=True)
+    assert dialog.confirmed
+    assert len(table) == 1
+    assert table.match('call-1', bob_fork, alice) is dialog
+    assert table.forks('call-1', 'a1') == [dialog]
+
+
+def test_missing_tag():
+    table = DialogTable()
+    with pytest.raises(DialogError):
+        table.add('call-1', alice, Header('<sip:bob@localhost>'))
+
+
+def test_unconfirm():
+    table = DialogTable()
+    table.add('call-1', alice, bob, confirmed=True)
+    with pytest.raises(DialogError):
+        table.add('call-1', alice, bob)
+
+
+def test_expire():
+    clock = Clock()
+    table = DialogTable(early_ttl=10, confirmed_ttl=100, clock=clock)
+    table.add('call-1', alice, bob)
+    table.add('call-1', alice, bob_fork)
+    table.confirm(DialogID('call-1', 'a1', 'b1'))
+
+    clock.now = 50
+    assert [d.remote.tag for d in table.expire()] == ['b2']
+    assert len(table) == 1
+
+    table.refresh(DialogID('call-1', 'a1', 'b1'))
+    clock.now = 120
+    assert table.expire() == []
+    clock.now = 150
+    assert len(table.expire()) == 1
+    assert len(table) == 0
+    assert table.forks('call-1', 'a1') == []
+
+
+def test_timers_bounded():
+    clock = Clock()
+    table = DialogTable(early_ttl=10, confirmed_ttl=100, clock=clock)
+    ids = [table.add(f'call-{n}', alice, bob, confirmed=True).id
+           for n in range(10)]
+    for step in range(10_000):
+        clock.now = step / 100
+        table.refresh(ids[step % 10])
+        assert len(table._timers) <= 2 * len(table) + 1
+    table.remove(ids[0])
+    clock.now = 1000
+    assert len(table.expire()) == 9
+    assert len(table) == 0 and len(table._timers) <= 1
+
+
+@pytest.mark.parametrize('count', [1_000, 250_000])
+def test_match(count, benchmark):
+    table = DialogTable()
+    uri = URI('sip:alice@localhost')
+    local = Header.build(uri=uri, tag='local')
+    for n in range(count):
+        table.add(f'call-{n}', local, Header.build(uri=uri, tag=f'r{n}'))
+    # a request received within the dialog, so the second lookup hits
+    dialog = benchmark(table.match, 'call-567',
+                       Header.build(uri=uri, tag='r567'), local)
+    assert dialog.id == DialogID('call-567', 'local', 'r567')
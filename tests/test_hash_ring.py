@@ -0,0 +1,101 @@
+import subprocess
+import sys
+from collections import Counter
+import pytest
+from ursine import URI
+from ursine.hash_ring import HashRing, HashRingError, shard_key, stable_hash
+
+
+NODES = [f'node{n}' for n in range(10)]
+URIS = [URI(f'sip:user{n}@example.com') for n in range(20000)]
+
+
+def test_same_aor_same_node():
+    ring = HashRing(NODES)
+    node = ring.get(URI('sip:alice@example.com'))
+    for same in ['sip:alice:pw@EXAMPLE.com;transport=tcp?x=y',
+                 'sips:alice@example.com',
+                 'sip:alice@example.com:5060']:
+        assert ring.get(URI(same)) == node
+    assert ring.get('alice@example.com') == node
+    assert ring.assign([URI('sip:alice@example.com')] * 3) == [node] * 3
+
+
+@pytest.mark.parametrize('uri,key', [
+    ('sip:alice@Example.COM:5080;transport=tcp', 'alice@example.com'),
+    ('sips:%61lice:pw@example.com', 'alice@example.com'),
+    ('sip:example.com', 'example.com'),
+    ('sip:bob@[2001:DB8::1]:5060', 'bob@[2001:db8::1]'),
+])
+def test_shard_key(uri, key):
+    assert shard_key(URI(uri)) == key
+
+
+def test_stable_across_processes():
+    code = ('from ursine.hash_ring import stable_hash; '
+            'print(stable_hash("sip:alice@example.com"))')
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    assert int(output) == stable_hash('sip:alice@example.com')
+
+
+def test_assign_matches_get():
+    ring = HashRing(NODES)
+    assert ring.assign(URIS[:500]) == [ring.get(uri) for uri in URIS[:500]]
+
+
+def test_distribution():
+    ring = HashRing(NODES)
+    load = Counter(ring.assign(URIS))
+    assert set(load) == set(NODES)
+    mean = len(URIS) / len(NODES)
+    assert max(load.values()) < 1.2 * mean
+    assert min(load.values()) > 0.8 * mean
+
+
+def test_minimal_remapping():
+    ring = HashRing(NODES)
+    before = ring.assign(URIS)
+    ring.add('node10')
+    after = ring.assign(URIS)
+    moved = [(old, new) for old, new in zip(before, after) if old != new]
+    # only keys taken over by the new node move, about 1/11 of them
+    assert all(new == 'node10' for _, new in moved)
+    assert len(moved) < 1.3 * len(URIS) / 11
+
+    ring.remove('node10')
+    assert ring.assign(URIS) == before
+
+
+def test_weight():
+    ring = HashRing(['small'])
+    ring.add('big', weight=3)
+    load = Counter(ring.assign(URIS))
+    assert 2.5 < load['big'] / load['small'] < 3.5
+
+
+def test_membership():
+    ring = HashRing(['a', 'b'])
+    assert len(ring) == 2 and 'a' in ring and ring.nodes == ('a', 'b')
+    ring.remove('a')
+    assert ring.get(URI('sip:alice@example.com')) == 'b'
+    with pytest.raises(HashRingError):
+        ring.remove('a')
+    ring.remove('b')
+    with pytest.raises(HashRingError):
+        ring.get(URI('sip:alice@example.com'))
+    with pytest.raises(HashRingError):
+        ring.assign([URI('sip:alice@example.com')])
+    with pytest.raises(HashRingError):
+        HashRing(vnodes=0)
+
+
+def test_assign_benchmark(benchmark):
+    ring = HashRing(NODES)
+    benchmark(ring.assign, URIS)
+
+
+def test_assign_aors_benchmark(benchmark):
+    ring = HashRing(NODES)
+    aors = [shard_key(uri) for uri in URIS]
+    benchmark(ring.assign, aors)
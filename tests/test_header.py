@@ -1,5 +1,6 @@
 import pytest
-from ursine import Header, URI
+from ursine import Header, URI, URIError
+from ursine.header import HeaderError
 
 
 @pytest.mark.parametrize('header,expect', [
@@ -93,3 +94,26 @@ def test_with_attr(original, attr, new_value, expect):
 ])
 def test_immutability(original, attr, new_value):
     assert original != getattr(original, f'with_{attr}')(new_value)
+
+
+@pytest.mark.parametrize('header,valid', [
+    ('"Bob" <sip:localhost;x=y>;tag=abc', True),
+    ('sip:localhost;tag=abc', True),
+    ('"Bob"\t<sip:localhost>', True),
+    ('"Bob <sip:localhost>', False),
+    ('<sip:localhost', False),
+    ('<sip:localhost>;tag', True),
+    ('<sip:localhost>;=x', False),
+    ('<sip:localhost:0>', False),
+    ('<http://localhost>', False),
+    ('<sip:localhost>;tag=a\r\nX: y', False),
+    ('', False),
+])
+def test_try_parse(header, valid):
+    result = Header.try_parse(header)
+    if valid:
+        assert result == Header(header)
+    else:
+        assert result is None
+        with pytest.raises((ValueError, URIError, HeaderError)):
+            Header(header)
@@ -1,6 +1,6 @@
 import pytest
 from ursine import URI
-from ursine.header_parsing import parse_header
+from ursine.header_parsing import parse_header, split_header_list
 
 
 @pytest.mark.parametrize('header,expect', [
@@ -22,6 +22,7 @@ def test_uri(header, expect):
     ('Alice <sip:localhost>', {}),
     ('Alice <sip:localhost>;tag=abc', {'tag': 'abc'}),
     ('Alice <sip:localhost>;tag=abc;foo=bar', {'tag': 'abc', 'foo': 'bar'}),
+    ('<sip:localhost>;lr;tag=abc', {'lr': None, 'tag': 'abc'}),
     ('Alice <sip:localhost;red=herring>', {}),
     ('Alice <sip:localhost;a=b;b=c>;tag=abc', {'tag': 'abc'}),
     ('Alice <sip:localhost;x=y;n=m>;tag=abc;foo=bar', {'tag': 'abc', 'foo': 'bar'}),
@@ -38,3 +39,14 @@ def test_parameters(header, expect):
 ])
 def test_display_name(header, expect):
     assert parse_header(header).display_name == expect
+
+
+@pytest.mark.parametrize('value,expect', [
+    ('<sip:a>, <sip:b>', ['<sip:a>', '<sip:b>']),
+    ('"a, b" <sip:a>,sip:b', ['"a, b" <sip:a>', 'sip:b']),
+    ('"a \\" ,b" <sip:a>', ['"a \\" ,b" <sip:a>']),
+    ('<sip:a?x=1,2>', ['<sip:a?x=1,2>']),
+    (' , ', []),
+])
+def test_split_header_list(value, expect):
+    assert split_header_list(value) == expect
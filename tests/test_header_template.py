@@ -0,0 +1,111 @@
+import pytest
+from ursine import Header, URI
+from ursine.header import HeaderError
+from ursine.header_template import HeaderTemplate, HeaderTemplateError
+
+
+TEMPLATE = ('"{display_name}" <sip:{user}@example.com;transport=tcp>'
+            ';tag={tag};x=1')
+
+
+def build(user, tag, display_name=None):
+    return Header.build(
+        uri=URI.build(scheme='sip', user=user, host='example.com',
+                      transport='tcp'),
+        display_name=display_name,
+        parameters={'x': '1'},
+        tag=tag,
+    )
+
+
+@pytest.mark.parametrize('values', [
+    {'user': 'alice', 'tag': 'abc', 'display_name': 'Alice'},
+    {'user': 'alice smith', 'tag': '1234', 'display_name': 'Alice Smith'},
+    {'user': '+15550100', 'tag': 'a1'},
+])
+def test_render(values):
+    template = HeaderTemplate(TEMPLATE)
+    expect = str(build(**values))
+    assert template.render(**values) == expect
+    assert Header(expect) == Header(template.render(**values))
+    buffer = bytearray(b'From: ')
+    assert template.render_into(buffer, **values) == len(expect)
+    assert buffer == b'From: ' + expect.encode()
+
+
+def test_render_random_tag():
+    template = HeaderTemplate('<sip:{user}@example.com>;tag={tag}')
+    first = Header(template.render(user='alice'))
+    second = Header(template.render(user='alice'))
+    assert first.tag and second.tag and first.tag != second.tag
+
+
+def test_fixed_parts():
+    template = HeaderTemplate('Bob <sip:bob@example.com>;tag={tag}')
+    assert template.holes == ('tag',)
+    assert template.render(tag='x') == \
+        '"Bob" <sip:bob@example.com;transport=udp>;tag=x'
+    assert str(template) == \
+        '"Bob" <sip:bob@example.com;transport=udp>;tag={tag}'
+
+
+@pytest.mark.parametrize('template', [
+    '<sip:{user}@{user}.example.com>',
+    '<sip:alice@{user}.example.com>',
+    '<sip:{username}@example.com>',
+    '<sip:alice@example.com>;x={tag}',
+    '"A {display_name}" <sip:alice@example.com>',
+    '<sip:{user}@example.com:99999>',
+    'garbage {user}',
+    '<sip:{user.x}@example.com>',
+    '<sip:{user[0]}@example.com>',
+    '<sip:{user!r}@example.com>',
+    '<sip:{user:>8}@example.com>',
+    '<sip:{}@example.com>',
+    '<sip:{user@example.com>',
+])
+def test_invalid_template(template):
+    with pytest.raises(HeaderTemplateError):
+        HeaderTemplate(template)
+
+
+def test_invalid_values():
+    template = HeaderTemplate(TEMPLATE)
+    with pytest.raises(HeaderError):
+        template.render(user='alice', display_name='"Alice"')
+    with pytest.raises(HeaderTemplateError):
+        template.render(tag='abc')
+
+
+USERS = [f'+1555{n:07d}' for n in range(1000)]
+
+
+def test_build_benchmark(benchmark):
+    def build_all():
+        return [str(build(user, f'{n:08x}', 'Dialer'))
+                for n, user in enumerate(USERS)]
+    benchmark(build_all)
+
+
+def test_template_benchmark(benchmark):
+    template = HeaderTemplate(TEMPLATE)
+
+    def render_all():
+        return [template.render(user=user, tag=f'{n:08x}',
+                                display_name='Dialer')
+                for n, user in enumerate(USERS)]
+    result = benchmark(render_all)
+    assert result[7] == str(build(USERS[7], f'{7:08x}', 'Dialer'))
+
+
+def test_template_bytes_benchmark(benchmark):
+    template = HeaderTemplate(TEMPLATE)
+
+    def render_all():
+        buffer = bytearray()
+        for n, user in enumerate(USERS):
+            template.render_into(buffer, user=user, tag=f'{n:08x}',
+                                 display_name='Dialer')
+            buffer += b'\r\n'
+        return buffer
+    benchmark(render_all)
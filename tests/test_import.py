@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import pytest
+
+
+def imported_modules(code):
+    '''Run `code` in a fresh interpreter, returning the modules it imported.'''
+    code += '\nimport sys; print(*sys.modules)'
+    proc = subprocess.run([sys.executable, '-c', code],
+                          capture_output=True, text=True, check=True)
+    return set(proc.stdout.split())
+
+
+HEAVY = {'multidict', 'urllib.parse', 'secrets', 'hashlib', 'ursine.tel'}
+
+
+def test_import_is_lazy():
+    modules = imported_modules('import ursine')
+    assert not {m for m in modules if m.startswith('ursine.')}
+    assert not HEAVY & modules
+
+
+@pytest.mark.parametrize('code', [
+    "from ursine import URI; URI('sip:alice@example.com;transport=tcp')",
+    "from ursine import Header; "
+    "Header('\"Alice\" <sip:alice@example.com>;tag=1').with_tag()",
+])
+def test_parse_without_heavy_imports(code):
+    assert not HEAVY & imported_modules(code)
+
+
+@pytest.mark.parametrize('code,module', [
+    ("from ursine import URI; URI('sip:alice@example.com?subject=hi')",
+     'multidict'),
+    ("from ursine import URI; URI('sip:al%20ice@example.com').user",
+     'urllib.parse'),
+    ("from ursine import Header; Header('<tel:+15550100>')", 'ursine.tel'),
+])
+def test_imported_when_needed(code, module):
+    assert module in imported_modules(code)
+
+
+def test_lazy_attributes():
+    import ursine
+    from ursine.uri import URI
+    assert ursine.URI is URI
+    assert 'Header' in dir(ursine)
+    with pytest.raises(AttributeError):
+        ursine.Nope
+
+
+def test_startup(benchmark):
+    # run with `python -X importtime -c 'import ursine.uri'` for a breakdown
+    benchmark.pedantic(
+        subprocess.run,
+        ([sys.executable, '-c',
+          "from ursine import URI; URI('sip:alice@example.com')"],),
+        {'check': True}, rounds=10)
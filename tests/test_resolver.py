@@ -0,0 +1,213 @@
+import asyncio
+import pytest
+from ursine import URI
+from ursine.resolver import (
+    AddressRecord,
+    DNSBackend,
+    NAPTRRecord,
+    Resolver,
+    SRVRecord,
+    Target,
+)
+
+
+class FakeBackend(DNSBackend):
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    async def query(self, name, rtype):
+        self.queries.append((name, rtype))
+        await asyncio.sleep(0)
+        answer = self.records.get((name, rtype), [])
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+RECORDS = {
+    ('example.com', 'NAPTR'): [
+        NAPTRRecord(20, 0, 's', 'SIP+D2U', '', '_sip._udp.example.com', 300),
+        NAPTRRecord(10, 0, 's', 'SIPS+D2T', '', '_sips._tcp.example.com', 300),
+        NAPTRRecord(30, 0, 'u', 'E2U+sip', '!^.*$!x!', '', 300),
+    ],
+    ('_sips._tcp.example.com', 'SRV'): [
+        SRVRecord(10, 0, 5061, 'tls.example.com', 300),
+    ],
+    ('_sip._udp.example.com', 'SRV'): [
+        SRVRecord(20, 0, 5080, 'udp2.example.com', 300),
+        SRVRecord(10, 0, 5060, 'udp1.example.com', 300),
+    ],
+    ('_sip._tcp.srv.test', 'SRV'): [
+        SRVRecord(10, 0, 5070, 'tcp.srv.test', 300),
+    ],
+    ('tls.example.com', 'A'): [AddressRecord('10.0.0.1', 300)],
+    ('udp1.example.com', 'A'): [AddressRecord('10.0.0.2', 300)],
+    ('udp2.example.com', 'AAAA'): [AddressRecord('::2', 300)],
+    ('tcp.srv.test', 'A'): [AddressRecord('10.0.1.1', 300)],
+    ('plain.test', 'A'): [AddressRecord('10.0.2.1', 60)],
+    ('plain.test', 'AAAA'): [AddressRecord('::1', 60)],
+}
+
+
+def resolve(uri, resolver=None):
+    resolver = resolver or Resolver(FakeBackend(RECORDS))
+    return asyncio.run(resolver.resolve(URI(uri)))
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:10.0.0.9', [Target('udp', '10.0.0.9', 5060)]),
+    ('sip:10.0.0.9:5080;transport=tcp', [Target('tcp', '10.0.0.9', 5080)]),
+    ('sips:[::9]', [Target('tls', '::9', 5061)]),
+    ('sip:plain.test;maddr=10.0.0.9', [Target('udp', '10.0.0.9', 5060)]),
+])
+def test_ip_literal(uri, expect):
+    assert resolve(uri) == expect
+
+
+def test_naptr():
+    assert resolve('sip:example.com') == [
+        Target('tls', '10.0.0.1', 5061),
+        Target('udp', '10.0.0.2', 5060),
+        Target('udp', '::2', 5080),
+    ]
+    assert resolve('sips:example.com') == [
+        Target('tls', '10.0.0.1', 5061),
+    ]
+
+
+def test_srv_without_naptr():
+    assert resolve('sip:srv.test') == [Target('tcp', '10.0.1.1', 5070)]
+    assert resolve('sip:srv.test;transport=tcp') == [
+        Target('tcp', '10.0.1.1', 5070),
+    ]
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:plain.test', [
+        Target('udp', '10.0.2.1', 5060),
+        Target('udp', '::1', 5060),
+    ]),
+    ('sip:plain.test:5080;transport=tcp', [
+        Target('tcp', '10.0.2.1', 5080),
+        Target('tcp', '::1', 5080),
+    ]),
+    ('sips:plain.test', [
+        Target('tls', '10.0.2.1', 5061),
+        Target('tls', '::1', 5061),
+    ]),
+    ('sip:missing.test', []),
+])
+def test_address_fallback(uri, expect):
+    assert resolve(uri) == expect
+
+
+def test_cache_ttl():
+    clock = Clock()
+    backend = FakeBackend(RECORDS)
+    resolver = Resolver(backend, clock=clock, negative_ttl=10)
+    resolve('sip:plain.test:5060', resolver)
+    resolve('sip:plain.test:5060', resolver)
+    resolve('sip:missing.test:5060', resolver)
+    resolve('sip:missing.test:5060', resolver)
+    assert len(backend.queries) == 4
+
+    clock.now = 30
+    resolve('sip:plain.test:5060', resolver)
+    resolve('sip:missing.test:5060', resolver)
+    assert len(backend.queries) == 6
+
+    clock.now = 90
+    resolve('sip:plain.test:5060', resolver)
+    assert len(backend.queries) == 8
+
+
+def test_coalescing():
+    backend = FakeBackend(RECORDS)
+    resolver = Resolver(backend)
+
+    async def run():
+        return await asyncio.gather(*[
+            resolver.resolve(URI('sip:example.com')) for _ in range(50)
+        ])
+
+    results = asyncio.run(run())
+    assert all(result == results[0] for result in results)
+    assert len(backend.queries) == len(set(backend.queries))
+
+
+def test_failure_not_cached():
+    backend = FakeBackend({('plain.test', 'A'): OSError('servfail')})
+    resolver = Resolver(backend)
+
+    async def run():
+        return await asyncio.gather(*[
+            resolver.resolve(URI('sip:plain.test:5060')) for _ in range(5)
+        ], return_exceptions=True)
+
+    assert all(isinstance(r, OSError) for r in asyncio.run(run()))
+    backend.records = RECORDS
+    assert resolve('sip:plain.test:5060', resolver)
+
+
+def test_srv_weights():
+    resolver = Resolver(FakeBackend({}))
+    records = [SRVRecord(10, 0, 1, 'zero', 1),
+               SRVRecord(10, 100, 2, 'heavy', 1),
+               SRVRecord(5, 0, 3, 'first', 1)]
+    picks = [resolver._srv_order(records) for _ in range(200)]
+    assert all(p[0].target == 'first' for p in picks)
+    assert sum(p[1].target == 'heavy' for p in picks) > 150
+
+
+def test_cancelled_caller():
+    backend = FakeBackend(RECORDS)
+    resolver = Resolver(backend)
+
+    async def run():
+        first = asyncio.ensure_future(resolver.query('plain.test', 'A'))
+        second = asyncio.ensure_future(resolver.query('plain.test', 'A'))
+        await asyncio.sleep(0)
+        first.cancel()
+        records = await second
+        assert first.cancelled()
+        return records
+
+    assert asyncio.run(run()) == RECORDS[('plain.test', 'A')]
+    assert backend.queries == [('plain.test', 'A')]
+
+
+def test_cache_bounded():
+    clock = Clock()
+    resolver = Resolver(FakeBackend(RECORDS), clock=clock, max_entries=10)
+    cache = resolver._cache
+
+    async def query(*names):
+        for name in names:
+            await resolver.query(name, 'A')
+
+    # one answer with a 60s TTL and nine negative ones cached for 30s
+    asyncio.run(query('plain.test', *[f'old{n}.test' for n in range(9)]))
+    assert len(cache) == 10
+    clock.now = 40
+    asyncio.run(query('new0.test'))
+    assert set(cache) == {('plain.test', 'A'), ('new0.test', 'A')}
+
+    # with nothing expired, the oldest answers go
+    asyncio.run(query(*[f'new{n}.test' for n in range(1, 10)]))
+    assert len(cache) == 8
+    assert ('plain.test', 'A') not in cache
+    assert ('new9.test', 'A') in cache
+
+    for n in range(1000):
+        clock.now = 40 + n
+        asyncio.run(query(f'host{n}.test'))
+        assert len(cache) <= 10
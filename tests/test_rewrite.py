@@ -0,0 +1,149 @@
+import pytest
+from ursine import Header, URI
+from ursine.rewrite import Rewriter, Rule, RewriteError
+
+
+RULES = [
+    Rule(match_host='pbx.internal', match_user=r'\+1(\d{10})',
+         user=r'1\1', host='edge.example.com'),
+    Rule(match_host='pbx.internal', user=None, port=5080),
+    Rule(match_scheme='sips', match_user=r'(?P<ext>\d{4})',
+         user=r'ext-\g<ext>', strip_parameters=['*']),
+    Rule(match_user=r'anon.*', display_name=None, tag=False,
+         strip_header_parameters=['x']),
+    Rule(strip_parameters=['maddr'], parameters={'lr': 'on'},
+         strip_headers=['*'], tag='fixed'),
+]
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:+15550001234@pbx.internal', 'sip:15550001234@edge.example.com'),
+    ('sip:+15550001234@PBX.internal:5070',
+     'sip:15550001234@edge.example.com:5070'),
+    ('sip:bob:secret@pbx.internal', 'sip:pbx.internal:5080'),
+    ('sips:1234@host;maddr=10.0.0.1;transport=udp',
+     'sips:ext-1234@host;transport=udp'),
+    ('sip:bob@host;maddr=10.0.0.1?subject=x',
+     'sip:bob@host;lr=on'),
+    ('sip:[::1]:5070;maddr=10.0.0.1;transport=tcp',
+     'sip:[::1]:5070;lr=on;transport=tcp'),
+])
+def test_rewrite_uri(uri, expect):
+    assert Rewriter(RULES).rewrite_uri(URI(uri)) == URI(expect)
+
+
+@pytest.mark.parametrize('header,expect', [
+    ('"Anon" <sip:anonymous@host>;tag=abc;x=y;z=w',
+     '<sip:anonymous@host>;z=w'),
+    ('"Bob" <sip:bob@host>;tag=abc', '"Bob" <sip:bob@host;lr=on>;tag=fixed'),
+])
+def test_rewrite_header(header, expect):
+    assert Rewriter(RULES).rewrite(Header(header)) == Header(expect)
+
+
+def test_first_match_wins():
+    rewriter = Rewriter([
+        Rule(match_user='a.*', user='first'),
+        Rule(match_host='host', match_user='ab', user='second'),
+        Rule(match_user='ab', user='third'),
+    ])
+    assert rewriter.rewrite_uri(URI('sip:ab@host')).user == 'first'
+    assert rewriter.rewrite_uri(URI('sip:b@host')) == URI('sip:b@host')
+
+
+def test_shared_prefixes():
+    rewriter = Rewriter([
+        Rule(match_user=r'\+1555\d+', user='a'),
+        Rule(match_user=r'\+1\d+', user='b'),
+        Rule(match_user=r'\+1555123', user='c'),
+        Rule(match_user=r'\+44\d*', user='d'),
+        Rule(match_user=r'\+1666\d+', user='e'),
+        Rule(match_user=r'x?y', user='f'),
+    ])
+    for user, expect in [('+15551', 'a'), ('+1555123', 'a'),
+                         ('+1666', 'b'), ('+44', 'd'), ('+4411', 'd'),
+                         ('y', 'f'), ('xy', 'f')]:
+        assert rewriter.rewrite_uri(URI(f'sip:{user}@h')).user == expect
+    assert rewriter.match(URI('sip:+2@h')) is None
+
+
+def test_unmergeable_patterns():
+    rewriter = Rewriter([
+        Rule(match_user=r'(?P<n>\d+)a', user=r'\g<n>'),
+        Rule(match_user=r'(?P<n>\d+)b', user=r'b\g<n>'),
+    ])
+    assert rewriter.rewrite_uri(URI('sip:12b@host')).user == 'b12'
+
+    rewriter = Rewriter([
+        Rule(match_user=r'(\d)x', user='x'),
+        Rule(match_user=r'(\d)\1', user='double'),
+    ])
+    assert rewriter.match(URI('sip:11@h')) is rewriter.rules[1]
+    assert rewriter.rewrite_uri(URI('sip:11@h')).user == 'double'
+
+
+def test_untouched_shared():
+    rewriter = Rewriter([Rule(tag=True)])
+    header = Header('<sip:bob@host>')
+    new = rewriter.rewrite(header)
+    assert new.uri is header.uri
+    assert new.tag and not header.tag
+    tagged = header.with_tag('abc')
+    assert rewriter.rewrite(tagged).tag == 'abc'
+
+
+def test_invalid():
+    with pytest.raises(RewriteError):
+        Rule(match_user='(')
+
+
+def test_rewrite_many():
+    rewriter = Rewriter(RULES)
+    headers = [Header('<sip:+15550001234@pbx.internal>'),
+               Header('"Anon" <sip:anonymous@host>;tag=abc')] * 3
+    assert rewriter.rewrite_many(headers) == [
+        rewriter.rewrite(header) for header in headers
+    ]
+
+
+# a dialplan routing each of 5000 number blocks from one of ten PBXs
+DIALPLAN = [
+    Rule(match_host=f'pbx{n % 10}.internal',
+         match_user=fr'\+1{n:04d}(\d{{6}})',
+         user=fr'1{n:04d}\1', host='edge.example.com',
+         strip_parameters=['maddr'])
+    for n in range(5000)
+] + [Rule(match_user=r'\+(\d+)', user=r'00\1')]
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:+10000123456@pbx0.internal', 'sip:10000123456@edge.example.com'),
+    ('sip:+14999123456@pbx9.internal;maddr=10.0.0.1',
+     'sip:14999123456@edge.example.com'),
+    ('sip:+14999123456@pbx0.internal', 'sip:0014999123456@pbx0.internal'),
+    ('sip:alice@pbx0.internal', 'sip:alice@pbx0.internal'),
+])
+def test_dialplan(uri, expect, benchmark):
+    rewriter = Rewriter(DIALPLAN)
+    new = benchmark(rewriter.rewrite_uri, URI(uri))
+    assert new == URI(expect)
+
+
+def test_dialplan_many(benchmark):
+    rewriter = Rewriter(DIALPLAN)
+    headers = [Header(f'<sip:+1{n:04d}000{n % 7:03d}@pbx{n % 10}.internal>')
+               for n in range(0, 5000, 5)]
+    result = benchmark(rewriter.rewrite_many, headers)
+    assert all(h.uri.host == 'edge.example.com' for h in result)
+
+
+def test_tel_untouched():
+    rewriter = Rewriter([Rule(tag=True), Rule(match_user='.*', user='x')])
+    header = Header('<tel:+1-555-0100>')
+    assert rewriter.match(header.uri) is None
+    assert rewriter.rewrite_uri(header.uri) is header.uri
+    assert rewriter.rewrite(header) is header
+    sip = Header('<sip:alice@host>')
+    result = rewriter.rewrite_many([header, sip])
+    assert result[0] is header
+    assert result[1].tag
@@ -0,0 +1,78 @@
+import pytest
+from ursine import Header, URI
+from ursine.route import RouteSet, RouteSetError
+
+
+RECORD_ROUTE = ('<sip:p1.example.com;lr>, '
+                '"Proxy, Two" <sip:p2.example.com;lr;transport=tcp>,'
+                '<sip:p3.example.com;lr>')
+
+
+def test_parse():
+    routes = RouteSet(RECORD_ROUTE)
+    assert [route.uri.host for route in routes] == [
+        'p1.example.com', 'p2.example.com', 'p3.example.com',
+    ]
+    assert routes[1].display_name == 'Proxy, Two'
+    assert routes.loose
+    assert routes.next_hop == URI('sip:p1.example.com;lr')
+    assert RouteSet(str(routes)) == routes
+
+
+def test_parse_list():
+    assert RouteSet.parse_list(['<sip:p1.example.com;lr>',
+                                '<sip:p2.example.com;lr>']) == \
+        RouteSet('<sip:p1.example.com;lr>,<sip:p2.example.com;lr>')
+
+
+def test_empty():
+    routes = RouteSet()
+    target = URI('sip:bob@client.example.com')
+    assert not routes
+    assert routes.next_hop is None
+    assert routes.route(target) == (target, routes, target)
+    with pytest.raises(RouteSetError):
+        routes.pop()
+
+
+def test_tel_route():
+    with pytest.raises(RouteSetError):
+        RouteSet('<sip:p1.example.com;lr>, <tel:+1-555-0100>')
+    with pytest.raises(RouteSetError):
+        RouteSet().prepend(Header('<tel:+1-555-0100>'))
+
+
+def test_loose_routing():
+    routes = RouteSet(RECORD_ROUTE).reversed()
+    target = URI('sip:bob@client.example.com')
+    request_uri, route_set, next_hop = routes.route(target)
+    assert request_uri == target
+    assert route_set is routes
+    assert next_hop == URI('sip:p3.example.com;lr')
+
+
+def test_strict_routing():
+    routes = RouteSet('<sip:strict.example.com?x=y>, <sip:p2.example.com;lr>')
+    target = URI('sip:bob@client.example.com')
+    assert not routes.loose
+    request_uri, route_set, next_hop = routes.route(target)
+    assert request_uri == URI('sip:strict.example.com')
+    assert next_hop == request_uri
+    assert route_set == RouteSet.build([URI('sip:p2.example.com;lr'), target])
+
+
+def test_prepend_pop():
+    routes = RouteSet('<sip:p2.example.com>')
+    assert not routes.loose
+    routes = routes.prepend(URI('sip:p1.example.com;lr'))
+    assert routes.loose
+    assert len(routes) == 2
+    first, rest = routes.pop()
+    assert first == Header('<sip:p1.example.com;lr>')
+    assert not rest.loose
+    assert len(routes) == 2
+
+
+def test_route_header_benchmark(benchmark):
+    routes = benchmark(RouteSet, RECORD_ROUTE)
+    assert len(routes) == 3
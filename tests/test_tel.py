@@ -0,0 +1,86 @@
+import copy
+import pytest
+from ursine import Header, URI
+from ursine.tel import TelURI, TelURIError, e164, normalize_many
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('tel:+1-201-555-0123', '+12015550123'),
+    ('tel:+1(201)555.0123;ext=42', '+12015550123'),
+    ('tel:555-0123;phone-context=+1-201', '+12015550123'),
+    ('tel:7042;phone-context=example.com', None),
+    ('tel:*67;phone-context=+1', None),
+])
+def test_e164(uri, expect):
+    assert TelURI(uri).e164 == expect
+
+
+@pytest.mark.parametrize('uri', [
+    'tel:+',
+    'tel:+1-201-55x',
+    'tel:5550123',
+    'tel:555;phone-context=+x',
+    'tel:5 55;phone-context=+1',
+])
+def test_invalid(uri):
+    with pytest.raises(TelURIError):
+        TelURI(uri)
+    assert TelURI.try_parse(uri) is None
+
+
+def test_properties():
+    tel = TelURI('tel:555-0123;ext=9;phone-context=+1-201')
+    assert not tel.is_global
+    assert tel.phone_context == '+1-201'
+    assert tel.extension == '9'
+    assert str(tel) == 'tel:555-0123;ext=9;phone-context=+1-201'
+    assert tel == TelURI.build(number='555-0123', phone_context='+1-201',
+                               parameters={'ext': '9'})
+    assert tel.e164 is tel.e164
+    assert tel.with_number('555-0199').e164 == '+12015550199'
+
+
+@pytest.mark.parametrize('uri,expect', [
+    (URI('sip:+1-201-555-0123@example.com;user=phone'), '+12015550123'),
+    (URI('sip:555-0123;phone-context=+1201@example.com;user=phone'),
+     '+12015550123'),
+    (URI('sip:%2B1-201-555-0123@example.com;user=phone'), '+12015550123'),
+    (URI('sip:+12015550123@example.com'), None),
+    (URI('sip:alice@example.com;user=phone'), None),
+    (TelURI('tel:+1-201-555-0123'), '+12015550123'),
+    ('tel:+1-201-555-0123', '+12015550123'),
+    ('garbage', None),
+])
+def test_e164_any(uri, expect):
+    assert e164(uri) == expect
+
+
+def test_e164_copies():
+    tel = TelURI('tel:+1-555-0100')
+    assert copy.deepcopy(tel).e164 == '+15550100'
+    tel.e164
+    assert copy.deepcopy(tel).e164 == '+15550100'
+    assert copy.copy(tel).e164 == '+15550100'
+    header = Header('<tel:+1-555-0100>').with_display_name('Bob')
+    assert header.uri.e164 == '+15550100'
+    assert TelURI('tel:7042;phone-context=example.com').e164 is None
+
+
+def test_header():
+    header = Header('"Alice" <tel:+1-201-555-0123>;tag=abc')
+    assert isinstance(header.uri, TelURI)
+    assert header.uri.e164 == '+12015550123'
+    assert Header.try_parse(str(header)) == header
+
+
+@pytest.fixture(scope='module')
+def numbers():
+    return ([f'tel:+1-201-555-{n:04d}' for n in range(1000)] +
+            [URI(f'sip:555-{n:04d};phone-context=+1201@example.com;'
+                 f'user=phone') for n in range(1000)]) * 5
+
+
+def test_normalize_many(numbers, benchmark):
+    result = benchmark(normalize_many, numbers)
+    assert result[:1000] == result[1000:2000]
+    assert result[1234] == '+12015550234'
@@ -0,0 +1,31 @@
+import pytest
+from ursine.tel_parsing import parse_tel, strip_separators
+
+
+@pytest.mark.parametrize('uri,number,parameters', [
+    ('tel:+1-201-555-0123', '+1-201-555-0123', {}),
+    ('tel:7042;phone-context=example.com',
+     '7042', {'phone-context': 'example.com'}),
+    ('tel:+1(201)5550123;EXT=42;isub=x', '+1(201)5550123',
+     {'ext': '42', 'isub': 'x'}),
+    ('tel:911;phone-context=+1;npdi', '911',
+     {'phone-context': '+1', 'npdi': None}),
+])
+def test_parse(uri, number, parameters):
+    result = parse_tel(uri)
+    assert (result.number, result.parameters) == (number, parameters)
+
+
+@pytest.mark.parametrize('uri', [
+    'sip:+1555',
+    '+1555',
+    'tel:+1555;ext=',
+    'tel:+1555;=x',
+])
+def test_parse_fail(uri):
+    with pytest.raises(ValueError):
+        parse_tel(uri)
+
+
+def test_strip_separators():
+    assert strip_separators('+1 (201) 555-01.23') == '+1 201 5550123'
@@ -0,0 +1,53 @@
+import os
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from ursine import Header, URI
+from ursine.header import random_tag
+
+
+HEADERS = [
+    f'"User {n}" <sip:user{n}@10.0.{n // 256}.{n % 256}:5060;transport=tcp>'
+    f';tag={n:08x}'
+    for n in range(2000)
+]
+
+
+def gil_enabled():
+    check = getattr(sys, '_is_gil_enabled', None)
+    return True if check is None else check()
+
+
+def parse_all(headers):
+    return [Header(header) for header in headers]
+
+
+def test_random_tag_threads():
+    with ThreadPoolExecutor(8) as pool:
+        tags = [tag for batch in pool.map(
+            lambda _: [random_tag() for _ in range(1000)], range(8))
+            for tag in batch]
+    assert len(set(tags)) == len(tags)
+    assert all(len(tag) == 16 for tag in tags)
+
+
+def test_no_shared_parameters():
+    uri = URI('sip:localhost;transport=tcp')
+    params = {'x': 'y'}
+    built = URI.build(scheme='sip', host='localhost', parameters=params)
+    assert uri.with_transport('udp').transport == 'udp'
+    assert uri.transport == 'tcp'
+    assert params == {'x': 'y'}
+    assert built.with_parameters({}).parameters == {}
+    assert built.parameters['x'] == 'y'
+
+
+@pytest.mark.parametrize('threads', sorted({1, 2, 4, os.cpu_count() or 1}))
+def test_parse_scaling(threads, benchmark):
+    benchmark.extra_info['threads'] = threads
+    benchmark.extra_info['gil'] = gil_enabled()
+    chunks = [HEADERS[n::threads] for n in range(threads)]
+    with ThreadPoolExecutor(threads) as pool:
+        def run():
+            return sum(len(r) for r in pool.map(parse_all, chunks))
+        assert benchmark(run) == len(HEADERS)
@@ -1,3 +1,4 @@
+import random
 import pytest
 from multidict import MultiDict
 from ursine import URI, URIError
@@ -48,6 +49,7 @@ def test_invalid(uri):
     'sip:[::dead:beef]',
 ])
 def test_ipv6_hostport(uri):
+    assert URI(uri).host == '[::dead:beef]'
     assert URI(uri).port == 5060
 
 
@@ -63,3 +65,156 @@ def test_ipv6_hostport(uri):
 ])
 def test_immutability(original, attr, new_value):
     assert original != getattr(original, f'with_{attr}')(new_value)
+
+
+@pytest.mark.parametrize('uri,attr,new_value', [
+    ('sip:localhost;transport=tcp', 'user', 'bob'),
+    ('sip:localhost;transport=tcp', 'host', '127.0.0.1'),
+    ('sips:localhost;transport=udp', 'port', 5080),
+])
+def test_with_attr_keeps_transport(uri, attr, new_value):
+    original = URI(uri)
+    new = getattr(original, f'with_{attr}')(new_value)
+    assert new.transport == original.transport
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:localhost', 'sip:localhost'),
+    ('sip:Alice:pw@Example.COM;transport=tcp?x=y', 'sip:Alice@example.com'),
+    ('sips:alice@[::1]:5080;maddr=1.1.1.1', 'sips:alice@[::1]:5080'),
+])
+def test_aor(uri, expect):
+    assert URI(uri).aor == expect
+
+
+@pytest.mark.parametrize('uri', [
+    'sip:@localhost',
+    'sip::5060',
+    'sip:user@local@host',
+    'sip:[::1',
+])
+def test_invalid_host(uri):
+    with pytest.raises(URIError):
+        URI(uri)
+
+
+def test_try_parse():
+    assert URI.try_parse('sip:alice@localhost') == URI('sip:alice@localhost')
+    assert URI.try_parse('sip:localhost:70000') is None
+    assert URI.try_parse('sip:localhost;x=y=z') is None
+    assert URI.try_parse('garbage') is None
+
+
+def test_try_parse_agrees():
+    rng = random.Random(3261)
+    alphabet = 'sip:;?@=&[]1x \x00'
+    for _ in range(5000):
+        candidate = rng.choice(['sip:', 'sips:', 's']) + ''.join(
+            rng.choice(alphabet) for _ in range(rng.randrange(8)))
+        try:
+            expect = URI(candidate)
+        except (ValueError, URIError):
+            expect = None
+        assert URI.try_parse(candidate) == expect, candidate
+
+
+MALFORMED = [
+    'INVITE sip:x', 'sip:', 'sip:;', 'http://example.com', 'sip:@x',
+    'sip:x:99999', 'sip:x;=a', 'sip:x?a', '\x00\x01\x02', 'sip:x\r\n',
+] * 100
+
+
+def test_malformed_raising(benchmark):
+    def parse_all():
+        failed = 0
+        for uri in MALFORMED:
+            try:
+                URI(uri)
+            except (ValueError, URIError):
+                failed += 1
+        return failed
+    assert benchmark(parse_all) == len(MALFORMED)
+
+
+def test_malformed_try_parse(benchmark):
+    def parse_all():
+        return sum(URI.try_parse(uri) is None for uri in MALFORMED)
+    assert benchmark(parse_all) == len(MALFORMED)
+
+
+@pytest.mark.parametrize('uri,user,password,escaped', [
+    ('sip:alice@host', 'alice', None, 'sip:alice@host'),
+    ('sip:%61lice@host', 'alice', None, 'sip:alice@host'),
+    ('sip:%2b1555;phone-context=x@host', '+1555;phone-context=x', None,
+     'sip:%2B1555;phone-context=x@host'),
+    ('sip:a%3bb@host', 'a;b', None, 'sip:a%3Bb@host'),
+    ('sip:a b@host', 'a b', None, 'sip:a%20b@host'),
+    ('sip:a%20b:p%40ss@host', 'a b', 'p@ss', 'sip:a%20b:p%40ss@host'),
+    ('sip:a%3ab:%3a@host', 'a:b', ':', 'sip:a%3Ab:%3A@host'),
+    ('sip:caf%C3%A9@host', 'café', None, 'sip:caf%C3%A9@host'),
+])
+def test_escapes(uri, user, password, escaped):
+    uri = URI(uri)
+    assert (uri.user, uri.password) == (user, password)
+    assert uri == URI(escaped)
+    assert uri.short_str() == escaped
+    assert uri.aor == URI(escaped).with_password(None).short_str()
+
+
+@pytest.mark.parametrize('escaped,plain', [
+    ('sip:%2B1555@host', 'sip:+1555@host'),
+    ('sip:a%3Bb@host', 'sip:a;b@host'),
+    ('sip:a:p%2Cw@host', 'sip:a:p,w@host'),
+])
+def test_escaped_reserved_distinct(escaped, plain):
+    assert URI(escaped) != URI(plain)
+    assert URI(escaped).user == URI(plain).user
+
+
+@pytest.mark.parametrize('uri', [
+    'sip:%zz@host',
+    'sip:a%2@host',
+    'sip:alice:%@host',
+])
+def test_malformed_escapes(uri):
+    with pytest.raises(URIError):
+        URI(uri)
+    assert URI.try_parse(uri) is None
+
+
+def test_escapes_cached():
+    uri = URI('sip:%61lice:pw@host')
+    assert uri.user is uri.user
+    assert uri.escaped_user is uri.escaped_user
+    assert uri.with_port(5080).user is uri.user
+
+
+@pytest.mark.parametrize('attr,value,expect', [
+    ('user', 'a b', 'sip:a%20b:p@host'),
+    ('user', 'a:b', 'sip:a%3Ab:p@host'),
+    ('user', None, 'sip:host'),
+    ('password', 'p@ss;', 'sip:alice:p%40ss%3B@host'),
+    ('password', None, 'sip:alice@host'),
+])
+def test_with_escapes(attr, value, expect):
+    uri = getattr(URI('sip:alice:p@host'), f'with_{attr}')(value)
+    assert uri.short_str() == expect
+    assert getattr(uri, attr) == value
+
+
+def test_build_escapes():
+    uri = URI.build(scheme='sip', host='host', user='a b', password='p@ss')
+    assert uri.short_str() == 'sip:a%20b:p%40ss@host'
+    assert (uri.user, uri.password) == ('a b', 'p@ss')
+    assert URI.build(scheme='sip', host='host', userinfo='%61') == \
+        URI('sip:a@host')
+
+
+@pytest.mark.parametrize('uri', [
+    'sip:alice@localhost',
+    'sip:%61l%69ce%20smith@localhost',
+])
+def test_user(uri, benchmark):
+    uri = URI(uri)
+    uri.user
+    assert benchmark(lambda: uri.user).startswith('alice')
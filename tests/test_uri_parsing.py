@@ -1,5 +1,5 @@
 import pytest
-from ursine.uri_parsing import parse_uri
+from ursine.uri_parsing import parse_uri, prefilter_uri
 
 
 @pytest.mark.parametrize('uri,expect', [
@@ -49,3 +49,50 @@ def test_hostport_fail(uri):
 ])
 def test_userinfo(uri, expect):
     assert parse_uri(uri).userinfo == expect
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:localhost', True),
+    ('sips:user@localhost:5061', True),
+    ('sip:;x@localhost', True),
+    ('sip:localhost;x=a@', True),
+    ('', False),
+    ('http://localhost', False),
+    ('SIP:localhost', False),
+    ('sip:', False),
+    ('sip:;x=y', False),
+    ('sip:?x=y', False),
+    ('sip::5060', False),
+    ('sip:@localhost', False),
+    ('sip:user@:5060', False),
+    ('sip:user@localhost\r\nX-Injected: 1', False),
+])
+def test_prefilter(uri, expect):
+    assert prefilter_uri(uri) is expect
+
+
+@pytest.mark.parametrize('uri', [
+    'sip:local\x00host',
+    'sip:localhost;x=\n',
+])
+def test_control_fail(uri):
+    with pytest.raises(ValueError):
+        parse_uri(uri)
+
+
+@pytest.mark.parametrize('uri,expect', [
+    ('sip:localhost;lr', {'lr': None}),
+    ('sip:localhost;lr;x=y', {'lr': None, 'x': 'y'}),
+    ('sip:localhost;x=', {'x': ''}),
+])
+def test_parameters(uri, expect):
+    assert parse_uri(uri).parameters == expect
+
+
+@pytest.mark.parametrize('uri', [
+    'sip:localhost;=x',
+    'sip:localhost;x=y=z',
+])
+def test_parameters_fail(uri):
+    with pytest.raises(ValueError):
+        parse_uri(uri)
@@ -0,0 +1,105 @@
+import pytest
+from ursine import Via
+from ursine.via import TransactionIndex, ViaError
+
+
+@pytest.mark.parametrize('via,expect', [
+    ('SIP/2.0/UDP localhost', Via.build(transport='udp', host='localhost')),
+    (
+        'SIP/2.0/TCP 10.0.0.1:5080;branch=z9hG4bK1',
+        Via.build(transport='TCP', host='10.0.0.1', port=5080,
+                  branch='z9hG4bK1'),
+    ),
+    (
+        'SIP/2.0/UDP [::1]:5080;rport;branch=z9hG4bK1;received=10.0.0.1',
+        Via.build(transport='UDP', sent_by='[::1]:5080',
+                  parameters={'rport': None, 'received': '10.0.0.1'},
+                  branch='z9hG4bK1'),
+    ),
+])
+def test_via(via, expect, benchmark):
+    via = benchmark(Via, via)
+    assert via == expect
+
+
+@pytest.mark.parametrize('via,host,port', [
+    ('SIP/2.0/UDP localhost', 'localhost', 5060),
+    ('SIP/2.0/TLS localhost', 'localhost', 5061),
+    ('SIP/2.0/UDP localhost:5080', 'localhost', 5080),
+    ('SIP/2.0/UDP [::dead:beef]', '[::dead:beef]', 5060),
+    ('SIP/2.0/UDP [::dead:beef]:5080', '[::dead:beef]', 5080),
+])
+def test_host_port(via, host, port):
+    via = Via(via)
+    assert (via.host, via.port) == (host, port)
+
+
+@pytest.mark.parametrize('via', [
+    'SIP/2.0/UDP localhost:port',
+    'SIP/2.0/UDP localhost:0',
+    'SIP/2.0/UDP localhost:70000',
+    'SIP/2.0/UDP localhost;rport=abc',
+])
+def test_invalid(via):
+    with pytest.raises(ViaError):
+        Via(via)
+
+
+def test_params():
+    via = Via('SIP/2.0/UDP localhost;branch=z9hG4bK1;rport')
+    assert via.branch == 'z9hG4bK1'
+    assert via.rfc3261_branch
+    assert via.rport is None
+    assert 'rport' in via.parameters
+    assert via.with_rport(5070).rport == 5070
+    assert via.with_received('1.2.3.4').received == '1.2.3.4'
+    assert str(via) == 'SIP/2.0/UDP localhost;branch=z9hG4bK1;rport'
+
+
+def test_parse_list():
+    vias = Via.parse_list('SIP/2.0/UDP a;branch=z9hG4bK1, SIP/2.0/TCP b')
+    assert [via.sent_by for via in vias] == ['a', 'b']
+
+
+@pytest.mark.parametrize('original,attr,new_value', [
+    (Via('SIP/2.0/UDP localhost'), 'transport', 'TCP'),
+    (Via('SIP/2.0/UDP localhost'), 'sent_by', 'localhost:5080'),
+    (Via('SIP/2.0/UDP localhost'), 'branch', 'z9hG4bK2'),
+    (Via('SIP/2.0/UDP localhost;branch=x'), 'branch', 'z9hG4bK2'),
+    (Via('SIP/2.0/UDP localhost'), 'rport', None),
+    (Via('SIP/2.0/UDP localhost'), 'parameters', {'x': 'y'}),
+])
+def test_immutability(original, attr, new_value):
+    assert original != getattr(original, f'with_{attr}')(new_value)
+
+
+def test_transaction_index():
+    index = TransactionIndex()
+    via = Via('SIP/2.0/UDP localhost;branch=z9hG4bK1')
+    index.add(via, 'INVITE', 'invite-tx')
+    index.add(via, 'CANCEL', 'cancel-tx')
+    assert index.match(via, 'INVITE') == 'invite-tx'
+    assert index.match(via, 'ACK') == 'invite-tx'
+    assert index.match(via, 'CANCEL') == 'cancel-tx'
+    assert index.match(via.with_sent_by('other'), 'INVITE') is None
+    assert index.match(via.with_branch('1'), 'INVITE') is None
+    with pytest.raises(ViaError):
+        index.add(via, 'INVITE', 'again')
+    with pytest.raises(ViaError):
+        index.add(via.with_branch('1'), 'INVITE', 'rfc2543')
+    assert index.remove(TransactionIndex.key(via, 'ACK')) == 'invite-tx'
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize('method,expect', [
+    ('INVITE', 4321),
+    ('ACK', 4321),
+    ('BYE', None),
+])
+def test_match(method, expect, benchmark):
+    index = TransactionIndex()
+    via = Via('SIP/2.0/UDP 10.0.0.1:5060')
+    for n in range(100_000):
+        index.add(via.with_branch(f'z9hG4bK{n}'), 'INVITE', n)
+    via = Via('SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK4321')
+    assert benchmark(index.match, via, method) == expect
@@ -0,0 +1,50 @@
+import pytest
+from ursine.via_parsing import parse_via, split_via_list
+
+
+@pytest.mark.parametrize('via,expect', [
+    ('SIP/2.0/UDP localhost', ('SIP/2.0', 'UDP')),
+    ('SIP/2.0/tcp localhost', ('SIP/2.0', 'TCP')),
+    ('SIP / 2.0 / TLS localhost', ('SIP/2.0', 'TLS')),
+])
+def test_protocol(via, expect):
+    result = parse_via(via)
+    assert (result.protocol, result.transport) == expect
+
+
+@pytest.mark.parametrize('via,expect', [
+    ('SIP/2.0/UDP localhost', 'localhost'),
+    ('SIP/2.0/UDP 10.0.0.1:5080;branch=z9hG4bKx', '10.0.0.1:5080'),
+    ('SIP/2.0/UDP [::dead:beef]:5080', '[::dead:beef]:5080'),
+])
+def test_sent_by(via, expect):
+    assert parse_via(via).sent_by == expect
+
+
+@pytest.mark.parametrize('via,expect', [
+    ('SIP/2.0/UDP localhost', {}),
+    ('SIP/2.0/UDP localhost;branch=z9hG4bKx', {'branch': 'z9hG4bKx'}),
+    ('SIP/2.0/UDP localhost;rport;branch=b', {'rport': None, 'branch': 'b'}),
+    ('SIP/2.0/UDP localhost ; rport=5060', {'rport': '5060'}),
+])
+def test_parameters(via, expect):
+    assert parse_via(via).parameters == expect
+
+
+@pytest.mark.parametrize('via', [
+    '',
+    'SIP/2.0 localhost',
+    'SIP/2.0/UDP',
+    'SIP/2.0/UDP localhost;branch=',
+    'SIP/2.0/UDP localhost;=x',
+])
+def test_via_fail(via):
+    with pytest.raises(ValueError):
+        parse_via(via)
+
+
+def test_split_via_list():
+    assert split_via_list('SIP/2.0/UDP a, SIP/2.0/TCP b;rport,') == [
+        'SIP/2.0/UDP a',
+        'SIP/2.0/TCP b;rport',
+    ]
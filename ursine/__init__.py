@@ -1,6 +1,31 @@
-from .uri import URI, URIError
-from .header import Header
+import importlib
 
 __author__ = 'Terry Kerr'
 __email__ = 't@xnr.ca'
 __version__ = '0.3.1'
+
+# public names and the submodules they live in; loaded on first access
+# (PEP 562) so `import ursine` stays cheap for short-lived processes
+_exports = {
+    'URI': 'uri',
+    'URIError': 'uri',
+    'Header': 'header',
+    'Via': 'via',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    try:
+        module = _exports[name]
+    except KeyError:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,173 @@
+'''Access control on URI hosts by domain and address block.'''
+import ipaddress
+import socket
+import typing as t
+from collections import namedtuple
+from .uri import URI
+
+
+ACLRule = namedtuple('ACLRule', (
+    'pattern',
+    'schemes',
+    'transports',
+    'value',
+))
+
+
+class ACLError(Exception):
+    pass
+
+
+class _DomainNode:
+    __slots__ = ('children', 'exact', 'wildcard')
+
+    def __init__(self):
+        self.children = {}
+        self.exact = []
+        self.wildcard = []
+
+
+class ACL:
+    '''A compiled set of rules matching URIs by host.
+
+    Patterns are domains (`example.com`), wildcard suffixes
+    (`*.example.com`, matching subdomains only, or `*` for every
+    domain) and IPv4/IPv6 addresses or CIDR blocks. Rules may also be
+    restricted to some schemes and transports.
+
+    Domains live in a trie of reversed labels, and address blocks in a
+    hash table per prefix length, so a match costs one step per label
+    of the host or per distinct prefix length in use rather than one
+    per rule. The most specific matching rule wins (exact domains over
+    wildcards, longer suffixes and prefixes over shorter ones), with
+    ties going to the rule added first.
+    '''
+
+    def __init__(self, rules: t.Iterable[t.Union[ACLRule, str]]=()):
+        self._domains = _DomainNode()
+        # family -> {prefix length: {network: [rules]}}
+        self._networks = {4: {}, 6: {}}
+        self._lengths = {4: [], 6: []}
+        self._count = 0
+        for rule in rules:
+            if isinstance(rule, str):
+                self.add(rule)
+            else:
+                self.add(*rule)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, pattern: str,
+            schemes: t.Optional[t.Iterable[str]]=None,
+            transports: t.Optional[t.Iterable[str]]=None,
+            value: t.Any=True):
+        '''Add a rule; `value` is what `match` returns when it applies.'''
+        if transports:
+            transports = frozenset(tp.lower() for tp in transports)
+        rule = ACLRule(pattern,
+                       frozenset(schemes) if schemes else None,
+                       transports if transports else None,
+                       value)
+        network = _parse_network(pattern)
+        if network is not None:
+            family = network.version
+            bits = network.max_prefixlen
+            length = network.prefixlen
+            table = self._networks[family].setdefault(length, {})
+            key = int(network.network_address) >> (bits - length)
+            table.setdefault(key, []).append(rule)
+            self._lengths[family] = sorted(self._networks[family],
+                                           reverse=True)
+        else:
+            self._add_domain(pattern, rule)
+        self._count += 1
+
+    def _add_domain(self, pattern, rule):
+        labels = pattern.lower().rstrip('.').split('.')
+        wildcard = labels[0] == '*'
+        if wildcard:
+            labels = labels[1:]
+        if '*' in labels or not all(labels):
+            raise ACLError(f'invalid domain pattern `{pattern}`')
+        node = self._domains
+        for label in reversed(labels):
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = _DomainNode()
+            node = child
+        (node.wildcard if wildcard else node.exact).append(rule)
+
+    def match(self, uri: URI, default: t.Any=None) -> t.Any:
+        '''Get the value of the most specific rule matching `uri`.'''
+        rule = self.match_rule(uri)
+        return default if rule is None else rule.value
+
+    def __contains__(self, uri):
+        return self.match_rule(uri) is not None
+
+    def match_rule(self, uri: URI) -> t.Optional[ACLRule]:
+        '''Get the most specific rule matching `uri`, if any.'''
+        host = uri.host
+        scheme = uri.scheme
+        transport = uri.transport
+        transport = transport.lower() if transport else transport
+        if host.startswith('['):
+            return self._match_address(6, host[1:-1], scheme, transport)
+        if host[-1:].isdigit():
+            # a top-level domain is never numeric, so this is an address
+            return self._match_address(4, host, scheme, transport)
+        return self._match_domain(host, scheme, transport)
+
+    def _match_domain(self, host, scheme, transport):
+        node = self._domains
+        # rule lists from least to most specific
+        candidates = []
+        for label in reversed(host.lower().rstrip('.').split('.')):
+            if node.wildcard:
+                candidates.append(node.wildcard)
+            node = node.children.get(label)
+            if node is None:
+                break
+        else:
+            if node.exact:
+                candidates.append(node.exact)
+        for rules in reversed(candidates):
+            for rule in rules:
+                if _allowed(rule, scheme, transport):
+                    return rule
+        return None
+
+    def _match_address(self, family, host, scheme, transport):
+        try:
+            packed = socket.inet_pton(
+                socket.AF_INET if family == 4 else socket.AF_INET6, host)
+        except OSError:
+            return None
+        address = int.from_bytes(packed, 'big')
+        bits = 32 if family == 4 else 128
+        networks = self._networks[family]
+        for length in self._lengths[family]:
+            rules = networks[length].get(address >> (bits - length))
+            if rules:
+                for rule in rules:
+                    if _allowed(rule, scheme, transport):
+                        return rule
+        return None
+
+
+def _allowed(rule, scheme, transport):
+    return ((rule.schemes is None or scheme in rule.schemes) and
+            (rule.transports is None or transport in rule.transports))
+
+
+def _parse_network(pattern):
+    '''Get the network for an address/CIDR pattern, or None for domains.'''
+    if pattern.startswith('['):
+        pattern = pattern.replace('[', '').replace(']', '')
+    elif ':' not in pattern and not pattern.split('/')[0][-1:].isdigit():
+        return None
+    try:
+        return ipaddress.ip_network(pattern, strict=False)
+    except ValueError:
+        raise ACLError(f'invalid address pattern `{pattern}`')
@@ -0,0 +1,233 @@
+'''A read-only, memory-mapped index of addresses-of-record.
+
+The index file holds the normalized AOR (see `URI.aor`) of every
+subscriber, sorted, along with an optional value per AOR. It's built
+once with `compile_index` (or `python -m ursine.aor_index`) and then
+opened with `AORIndex` by as many processes as needed: the file is
+mapped rather than loaded, so workers share the same pages and start
+up without parsing anything.
+
+Layout (all integers unsigned 64-bit, in the byte order noted in
+the header)::
+
+    magic (8 bytes) | count
+    key offsets   (count + 1)
+    value offsets (count + 1)
+    key data | value data
+'''
+import argparse
+import mmap
+import os
+import sys
+import tempfile
+import typing as t
+from .uri import URI, URIError
+
+
+MAGIC_LE = b'URSAOR\x01<'
+MAGIC_BE = b'URSAOR\x01>'
+NATIVE_MAGIC = MAGIC_LE if sys.byteorder == 'little' else MAGIC_BE
+HEADER_SIZE = 16
+
+
+class AORIndexError(Exception):
+    pass
+
+
+def _aor_key(uri):
+    if not isinstance(uri, URI):
+        uri = URI(uri)
+    return uri.aor.encode()
+
+
+def compile_index(entries: t.Iterable[t.Union[URI, str,
+                                              t.Tuple[t.Union[URI, str],
+                                                      bytes]]],
+                  path: str) -> int:
+    '''Write an index of `entries` to `path`, returning the AOR count.
+
+    Entries are URIs (or strings to parse as URIs), optionally paired
+    with a bytes value. URIs sharing an AOR are stored once, with the
+    value of the last of them.
+
+    An existing index at `path` is replaced atomically, so it can be
+    rebuilt while other processes have it open; they keep seeing the
+    old index until they reopen it.
+    '''
+    table = {}
+    for entry in entries:
+        if isinstance(entry, tuple):
+            uri, value = entry
+        else:
+            uri, value = entry, b''
+        table[_aor_key(uri)] = bytes(value)
+    keys = sorted(table)
+    count = len(keys)
+
+    def offsets(blobs):
+        result = [0]
+        for blob in blobs:
+            result.append(result[-1] + len(blob))
+        return result
+
+    key_offsets = offsets(keys)
+    value_offsets = offsets(table[key] for key in keys)
+    # written alongside and renamed into place, so processes with the
+    # old index mapped keep their (now unlinked) file intact rather
+    # than seeing it truncated under them
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', dir=directory)
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o644
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(NATIVE_MAGIC)
+            fp.write(count.to_bytes(8, sys.byteorder))
+            for offset in key_offsets + value_offsets:
+                fp.write(offset.to_bytes(8, sys.byteorder))
+            for key in keys:
+                fp.write(key)
+            for key in keys:
+                fp.write(table[key])
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return count
+
+
+class AORIndex:
+    '''A memory-mapped AOR index, as written by `compile_index`.
+
+    Lookups take a URI (or an AOR string already in `URI.aor` form)
+    and binary search the mapped keys, so only the pages touched are
+    ever read.
+    '''
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as fp:
+            try:
+                self._map = mmap.mmap(fp.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            except ValueError:
+                raise AORIndexError(f'{path} is empty')
+        try:
+            self._open()
+        except Exception:
+            self._map.close()
+            raise
+
+    def _open(self):
+        mapped = self._map
+        magic = mapped[:8]
+        if magic not in (MAGIC_LE, MAGIC_BE):
+            raise AORIndexError('not an AOR index')
+        if magic != NATIVE_MAGIC:
+            raise AORIndexError('index was written with another byte order')
+        count = int.from_bytes(mapped[8:16], sys.byteorder)
+        table_end = HEADER_SIZE + 16 * (count + 1)
+        if len(mapped) < table_end:
+            raise AORIndexError('truncated AOR index')
+        view = memoryview(mapped)
+        self._count = count
+        self._key_offsets = view[HEADER_SIZE:HEADER_SIZE + 8 * (count + 1)
+                                 ].cast('Q')
+        self._value_offsets = view[HEADER_SIZE + 8 * (count + 1):table_end
+                                   ].cast('Q')
+        self._keys = table_end
+        self._values = table_end + self._key_offsets[count]
+        if len(mapped) < self._values + self._value_offsets[count]:
+            raise AORIndexError('truncated AOR index')
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''Unmap the index.'''
+        self._key_offsets.release()
+        self._value_offsets.release()
+        self._map.close()
+
+    def _find(self, key):
+        '''Binary search for `key`, returning its position or -1.'''
+        mapped = self._map
+        offsets = self._key_offsets
+        base = self._keys
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            probe = mapped[base + offsets[mid]:base + offsets[mid + 1]]
+            if probe < key:
+                low = mid + 1
+            elif probe > key:
+                high = mid
+            else:
+                return mid
+        return -1
+
+    def __contains__(self, uri):
+        return self._find(self._key(uri)) != -1
+
+    def get(self, uri: t.Union[URI, str],
+            default: t.Optional[bytes]=None) -> t.Optional[bytes]:
+        '''Get the value stored for the AOR of `uri`.'''
+        position = self._find(self._key(uri))
+        if position == -1:
+            return default
+        offsets = self._value_offsets
+        base = self._values
+        return self._map[base + offsets[position]:
+                         base + offsets[position + 1]]
+
+    def aors(self) -> t.Iterator[str]:
+        '''Iterate over the stored AORs in sorted order.'''
+        offsets = self._key_offsets
+        base = self._keys
+        for position in range(self._count):
+            yield self._map[base + offsets[position]:
+                            base + offsets[position + 1]].decode()
+
+    @staticmethod
+    def _key(uri):
+        return uri.aor.encode() if isinstance(uri, URI) else uri.encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ursine.aor_index',
+        description='Compile a list of URIs, one per line, optionally '
+                    'followed by a tab and a value, into an AOR index.')
+    parser.add_argument('input', type=argparse.FileType('r'),
+                        help='URI list (- for stdin)')
+    parser.add_argument('output', help='index file to write')
+    args = parser.parse_args(argv)
+
+    def entries():
+        for number, line in enumerate(args.input, 1):
+            line = line.rstrip('\r\n')
+            if not line or line.startswith('#'):
+                continue
+            uri, _, value = line.partition('\t')
+            try:
+                yield URI(uri.strip()), value.encode()
+            except (ValueError, URIError) as exc:
+                parser.error(f'line {number}: {exc}')
+
+    count = compile_index(entries(), args.output)
+    print(f'wrote {count} AORs to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
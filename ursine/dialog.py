@@ -0,0 +1,207 @@
+'''Dialog tracking keyed on Call-ID and From/To tags.'''
+import heapq
+import time
+import typing as t
+from collections import namedtuple
+from .header import Header
+
+
+DialogID = namedtuple('DialogID', (
+    'call_id',
+    'local_tag',
+    'remote_tag',
+))
+
+
+class DialogError(Exception):
+    pass
+
+
+class Dialog:
+    '''A SIP dialog, either early or confirmed.'''
+    __slots__ = (
+        '_id',
+        '_local',
+        '_remote',
+        '_confirmed',
+        '_expires',
+    )
+
+    def __init__(self, call_id: str, local: Header, remote: Header,
+                 confirmed: bool, expires: float):
+        if not local.tag or not remote.tag:
+            raise DialogError('both local and remote headers need a tag')
+        self._id = DialogID(call_id, local.tag, remote.tag)
+        self._local = local
+        self._remote = remote
+        self._confirmed = confirmed
+        self._expires = expires
+
+    id = property(lambda self: self._id)
+    call_id = property(lambda self: self._id.call_id)
+    local = property(lambda self: self._local)
+    remote = property(lambda self: self._remote)
+    confirmed = property(lambda self: self._confirmed)
+    early = property(lambda self: not self._confirmed)
+    expires = property(lambda self: self._expires)
+
+    def __repr__(self):
+        state = 'confirmed' if self._confirmed else 'early'
+        return f'{self.__class__.__name__}({self._id}, {state})'
+
+
+class DialogTable:
+    '''A table of dialogs with O(1) matching of in-dialog requests.
+
+    Dialogs are indexed by (Call-ID, local tag, remote tag). Forked
+    early dialogs share the Call-ID and local tag and differ only in
+    the remote tag, so they are additionally grouped by
+    (Call-ID, local tag) to allow them to be found or discarded
+    together once one of them is confirmed.
+
+    Every dialog has an expiry, refreshed whenever it is updated, and
+    `expire` drops the ones whose time has passed. Expiries live in a
+    heap; superseded entries are left in place rather than searched
+    for, and the heap is rebuilt once they outnumber the live ones.
+    '''
+
+    def __init__(self, *,
+                 early_ttl: float=180.0,
+                 confirmed_ttl: float=3600.0,
+                 clock: t.Callable[[], float]=time.monotonic):
+        self._early_ttl = early_ttl
+        self._confirmed_ttl = confirmed_ttl
+        self._clock = clock
+        self._dialogs = {}
+        self._forks = {}
+        self._timers = []
+        # heap entries for dialogs since updated or removed
+        self._stale = 0
+
+    def __len__(self):
+        return len(self._dialogs)
+
+    def __contains__(self, dialog_id):
+        return dialog_id in self._dialogs
+
+    def __iter__(self):
+        return iter(list(self._dialogs.values()))
+
+    def get(self, dialog_id: DialogID) -> t.Optional[Dialog]:
+        '''Get a dialog by its exact id.'''
+        return self._dialogs.get(dialog_id)
+
+    def add(self, call_id: str, local: Header, remote: Header, *,
+            confirmed: bool=False) -> Dialog:
+        '''Add a dialog, or update the existing one with the same id.
+
+        Re-adding an early dialog with `confirmed=True` confirms it.
+        '''
+        ttl = self._confirmed_ttl if confirmed else self._early_ttl
+        dialog = Dialog(call_id, local, remote, confirmed,
+                        self._clock() + ttl)
+        key = dialog.id
+        existing = self._dialogs.get(key)
+        if existing is not None and existing.confirmed and not confirmed:
+            raise DialogError(f'dialog {key} is already confirmed')
+        if existing is not None:
+            self._stale += 1
+        self._dialogs[key] = dialog
+        fork_key = (call_id, key.local_tag)
+        forks = self._forks.get(fork_key)
+        if forks is None:
+            forks = self._forks[fork_key] = {}
+        forks[key.remote_tag] = dialog
+        heapq.heappush(self._timers, (dialog.expires, key))
+        self._compact()
+        return dialog
+
+    def confirm(self, dialog_id: DialogID, *,
+                drop_forks: bool=False) -> Dialog:
+        '''Confirm an early dialog.
+
+        If `drop_forks` is true, every other early dialog forked from
+        the same request is removed from the table.
+        '''
+        dialog = self._dialogs.get(dialog_id)
+        if dialog is None:
+            raise DialogError(f'no dialog {dialog_id}')
+        if not dialog.confirmed:
+            dialog = self.add(dialog.call_id, dialog.local, dialog.remote,
+                              confirmed=True)
+        if drop_forks:
+            for fork in self.forks(dialog_id.call_id, dialog_id.local_tag):
+                if fork.early:
+                    self.remove(fork.id)
+        return dialog
+
+    def refresh(self, dialog_id: DialogID) -> Dialog:
+        '''Push back the expiry of a dialog.'''
+        dialog = self._dialogs.get(dialog_id)
+        if dialog is None:
+            raise DialogError(f'no dialog {dialog_id}')
+        return self.add(dialog.call_id, dialog.local, dialog.remote,
+                        confirmed=dialog.confirmed)
+
+    def remove(self, dialog_id: DialogID) -> t.Optional[Dialog]:
+        '''Remove a dialog, returning it if it was present.'''
+        dialog = self._discard(dialog_id)
+        if dialog is not None:
+            self._stale += 1
+            self._compact()
+        return dialog
+
+    def _discard(self, dialog_id):
+        dialog = self._dialogs.pop(dialog_id, None)
+        if dialog is None:
+            return None
+        fork_key = (dialog_id.call_id, dialog_id.local_tag)
+        forks = self._forks[fork_key]
+        del forks[dialog_id.remote_tag]
+        if not forks:
+            del self._forks[fork_key]
+        return dialog
+
+    def forks(self, call_id: str, local_tag: str) -> t.List[Dialog]:
+        '''Get all dialogs sharing a Call-ID and local tag.'''
+        return list(self._forks.get((call_id, local_tag), {}).values())
+
+    def match(self, call_id: str,
+              from_header: Header, to_header: Header) -> t.Optional[Dialog]:
+        '''Find the dialog an in-dialog request belongs to.
+
+        The request may come from either side: for requests we send the
+        From tag is the local tag, for requests we receive it is the
+        remote tag. Both are tried, each in a single dict lookup.
+        '''
+        from_tag = from_header.tag
+        to_tag = to_header.tag
+        dialogs = self._dialogs
+        dialog = dialogs.get((call_id, to_tag, from_tag))
+        if dialog is None:
+            dialog = dialogs.get((call_id, from_tag, to_tag))
+        return dialog
+
+    def expire(self, now: t.Optional[float]=None) -> t.List[Dialog]:
+        '''Remove and return every dialog whose expiry has passed.'''
+        if now is None:
+            now = self._clock()
+        timers = self._timers
+        dialogs = self._dialogs
+        expired = []
+        while timers and timers[0][0] <= now:
+            expires, key = heapq.heappop(timers)
+            dialog = dialogs.get(key)
+            if dialog is not None and dialog.expires == expires:
+                expired.append(self._discard(key))
+            else:
+                self._stale -= 1
+        return expired
+
+    def _compact(self):
+        '''Rebuild the timer heap once stale entries outnumber live ones.'''
+        if self._stale > len(self._dialogs):
+            self._timers = [(dialog.expires, key)
+                            for key, dialog in self._dialogs.items()]
+            heapq.heapify(self._timers)
+            self._stale = 0
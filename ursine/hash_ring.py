@@ -0,0 +1,121 @@
+'''Consistent hashing of addresses-of-record onto nodes.'''
+import bisect
+import hashlib
+import typing as t
+from .uri import URI
+
+
+class HashRingError(Exception):
+    pass
+
+
+def stable_hash(key: str) -> int:
+    '''A 64-bit hash of `key` that's the same in every process.
+
+    Unlike the builtin `hash`, this isn't randomized per interpreter,
+    so every worker and node agrees on it.
+    '''
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+def shard_key(uri: URI) -> str:
+    '''The key a URI is sharded on: `user@host`, with the host lowercased.
+
+    Unlike `URI.aor` the scheme and port are left out, so
+    `sip:alice@example.com`, `sips:alice@example.com` and
+    `sip:alice@example.com:5060` (a registration and the requests for
+    it may well differ like this) all share a shard.
+    '''
+    user = uri.escaped_user
+    host = uri.host.lower()
+    return f'{user}@{host}' if user else host
+
+
+class HashRing:
+    '''A consistent-hash ring assigning URIs to nodes by their AOR.
+
+    URIs are keyed on `shard_key` (`user@host`), so every URI for the
+    same address-of-record lands on the same node whatever its scheme,
+    port, password, parameters or headers. Each node is placed on the
+    ring at `vnodes` points (times its weight) to even out the load,
+    and a node joining or leaving only moves the AORs next to its own
+    points.
+
+    Nodes are named by strings, which is what gets hashed to place
+    them, so the ring is the same in every process given the same
+    nodes.
+    '''
+
+    def __init__(self, nodes: t.Iterable[str]=(), vnodes: int=160):
+        if vnodes < 1:
+            raise HashRingError('vnodes must be at least 1')
+        self._vnodes = vnodes
+        self._weights = {}
+        self._points = []
+        self._owners = []
+        for node in nodes:
+            self._weights[node] = 1
+        self._build()
+
+    def _build(self):
+        ring = sorted((stable_hash(f'{node}#{index}'), node)
+                      for node, weight in self._weights.items()
+                      for index in range(self._vnodes * weight))
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    nodes = property(lambda self: tuple(self._weights))
+    vnodes = property(lambda self: self._vnodes)
+
+    def __len__(self):
+        return len(self._weights)
+
+    def __contains__(self, node):
+        return node in self._weights
+
+    def add(self, node: str, weight: int=1):
+        '''Add a node, or change its weight if it's already present.'''
+        if weight < 1:
+            raise HashRingError('weight must be at least 1')
+        self._weights[node] = weight
+        self._build()
+
+    def remove(self, node: str):
+        '''Remove a node; its AORs are spread across the others.'''
+        try:
+            del self._weights[node]
+        except KeyError:
+            raise HashRingError(f'unknown node {node}')
+        self._build()
+
+    @staticmethod
+    def _key(uri):
+        return shard_key(uri) if isinstance(uri, URI) else uri
+
+    def get(self, uri: t.Union[URI, str]) -> str:
+        '''Get the node for `uri` (or a key in `shard_key` form).'''
+        if not self._points:
+            raise HashRingError('no nodes in the ring')
+        index = bisect.bisect(self._points, stable_hash(self._key(uri)))
+        # past the last point wraps around to the first
+        return self._owners[index if index < len(self._owners) else 0]
+
+    def assign(self, uris: t.Iterable[t.Union[URI, str]]) -> t.List[str]:
+        '''Get the node for each of a batch of URIs.'''
+        if not self._points:
+            raise HashRingError('no nodes in the ring')
+        points = self._points
+        owners = self._owners
+        count = len(owners)
+        blake2b = hashlib.blake2b
+        from_bytes = int.from_bytes
+        find = bisect.bisect
+        result = []
+        for uri in uris:
+            key = shard_key(uri) if isinstance(uri, URI) else uri
+            point = from_bytes(
+                blake2b(key.encode(), digest_size=8).digest(), 'big')
+            index = find(points, point)
+            result.append(owners[index if index < count else 0])
+        return result
@@ -1,13 +1,21 @@
 import copy
-import random
-import string
+import os
 import typing as t
 from .uri import URI
-from .header_parsing import parse_header
+from .header_parsing import parse_header, prefilter_header, _split_header
+
+if t.TYPE_CHECKING:
+    from .tel import TelURI
 
 
 def random_tag():
-    return ''.join(random.choices(string.hexdigits, k=16))
+    '''Generate a random 16 hex digit tag.
+
+    Drawn from the OS CSPRNG, so no generator state is shared between
+    threads or inherited across forks.
+    '''
+    # what secrets.token_hex does, without importing secrets (and hashlib)
+    return os.urandom(8).hex()
 
 
 class HeaderError(Exception):
@@ -28,9 +36,36 @@ class Header:
         self._parameters = result.parameters
         self._uri = result.uri
 
+    @classmethod
+    def try_parse(cls, header: str) -> t.Optional['Header']:
+        '''Parse a Header, returning None rather than raising if invalid.
+
+        Obviously malformed input is rejected by `prefilter_header`
+        before any parsing.
+        '''
+        if not prefilter_header(header):
+            return None
+        result, error = _split_header(header)
+        if error:
+            return None
+        if result.uri.startswith('tel:'):
+            from .tel import TelURI
+            uri = TelURI.try_parse(result.uri)
+        else:
+            uri = URI.try_parse(result.uri)
+        if uri is None:
+            return None
+        self = object.__new__(cls)
+        self._display_name = result.display_name
+        self._parameters = result.parameters
+        self._uri = uri
+        if self._check():
+            return None
+        return self
+
     @classmethod
     def build(cls, *,
-              uri: URI,
+              uri: t.Union[URI, 'TelURI'],
               display_name: t.Optional[str]=None,
               parameters: t.Optional[t.Dict[str, str]]=None,
               tag: t.Optional[str]=None) -> 'Header':
@@ -38,7 +73,7 @@ class Header:
         self = object.__new__(cls)
         self._uri = uri
         self._display_name = display_name
-        self._parameters = parameters if parameters else {}
+        self._parameters = dict(parameters) if parameters else {}
         if tag:
             self._parameters['tag'] = tag
         self._validate()
@@ -56,7 +91,7 @@ class Header:
         new._validate()
         return new
 
-    def with_uri(self, uri: URI):
+    def with_uri(self, uri: t.Union[URI, 'TelURI']):
         '''Create a new Header from `self` with a specific URI.'''
         new = copy.copy(self)
         new._uri = uri
@@ -86,14 +121,21 @@ class Header:
         new._parameters['tag'] = tag
         return new
 
+    def _check(self):
+        '''Check the correctness of properties, returning any error.'''
+        if self.display_name and '"' in self.display_name:
+            return 'display name cannot contain `"`'
+        return None
+
     def _validate(self):
         '''Ensure correctness of properties.'''
-        if self.display_name and '"' in self.display_name:
-            raise HeaderError('display name cannot contain `"`')
+        error = self._check()
+        if error:
+            raise HeaderError(error)
 
     def __str__(self):
         display_name = f'"{self._display_name}" ' if self._display_name else ''
-        param_pairs = ';'.join(['='.join([k, v])
+        param_pairs = ';'.join([k if v is None else '='.join([k, v])
                                 for k, v in sorted(self._parameters.items())])
         params = f';{param_pairs}' if param_pairs else ''
         return f'{display_name}<{self._uri}>{params}'
@@ -1,6 +1,7 @@
 '''Parsing for SIP URIs.'''
 from .uri import URI
 from collections import namedtuple
+import re
 
 
 HeaderParseResult = namedtuple('HeaderParseResult', (
@@ -10,40 +11,78 @@ HeaderParseResult = namedtuple('HeaderParseResult', (
 ))
 
 
-def parse_params(params_str):
+control_re = re.compile(r'[\x00-\x08\x0a-\x1f\x7f]')
+
+
+def prefilter_header(hdr):
+    '''Cheaply check whether `hdr` could possibly be a SIP header value.
+
+    Like `prefilter_uri`, this never rejects a value `Header` would
+    accept.
+    '''
+    if 'sip:' not in hdr and 'sips:' not in hdr and 'tel:' not in hdr:
+        return False
+    return control_re.search(hdr) is None
+
+
+# errors from the non-raising parsers, formatted with the value being
+# parsed only when raised
+CONTROL_CHARACTERS = 'headers cannot contain control characters'
+UNBALANCED_DELIMITERS = 'unbalanced <> delimiters in `{value}`'
+UNBALANCED_QUOTES = 'unbalanced double-quotes in `{value}`'
+INVALID_PARAMETER = 'invalid header parameter in `{value}`'
+
+
+def _parse_params(params_str):
     params = {}
     for pair in params_str.split(';'):
         if pair == '':
             continue
         key, eq, val = pair.partition('=')
-        if not key or not eq:
-            raise ValueError(f'invalid uri parameter `{pair}`')
-        params[key] = val
+        if not key:
+            return None, INVALID_PARAMETER
+        params[key] = val if eq else None
+    return params, None
+
+
+def parse_params(params_str):
+    params, error = _parse_params(params_str)
+    if error:
+        raise ValueError(error.format(value=params_str))
     return params
 
 
-def parse_display_name(dsp):
+def _parse_display_name(dsp):
     if dsp is None:
-        return None
+        return None, None
     if '"' in dsp:
         quoted_parts = dsp.split('"', 2)
         if len(quoted_parts) != 3 or '=' in quoted_parts[2]:
-            raise ValueError(f'unbalanced double-quotes in `{dsp}`')
-        return quoted_parts[1]
+            return None, UNBALANCED_QUOTES
+        return quoted_parts[1], None
     else:
-        return dsp.strip()
+        return dsp.strip(), None
 
 
-def parse_header(hdr):
-    '''Parse a SIP URI in a header format.
+def parse_display_name(dsp):
+    display_name, error = _parse_display_name(dsp)
+    if error:
+        raise ValueError(error.format(value=dsp))
+    return display_name
 
-    Ex `Alice <sip:localhost>`
+
+def _split_header(hdr):
+    '''Parse a header without raising, returning (result, error).
+
+    The result's `uri` is left as the unparsed URI string.
     '''
+    if control_re.search(hdr) is not None:
+        return None, CONTROL_CHARACTERS
     uri_start = hdr.find('<')
     uri_end = hdr.find('>')
     if ((uri_start == -1) ^ (uri_end == -1) or
             uri_start > uri_end):
-        raise ValueError('unbalanced <> delimiters')
+        return None, UNBALANCED_DELIMITERS
     if uri_start == -1:
         display_part = None
         uri_part, _, params_part = hdr.partition(';')
@@ -52,8 +91,63 @@ def parse_header(hdr):
         uri_part = hdr[uri_start+1:uri_end]
         params_part = hdr[uri_end+1:]
 
+    display_name, error = _parse_display_name(display_part)
+    if error:
+        return None, error
+    parameters, error = _parse_params(params_part)
+    if error:
+        return None, error
     return HeaderParseResult(
-        display_name=parse_display_name(display_part),
-        parameters=parse_params(params_part),
-        uri=URI(uri_part),
-    )
+        display_name=display_name,
+        parameters=parameters,
+        uri=uri_part,
+    ), None
+
+
+def split_header_list(value):
+    '''Split a comma separated header field value into single values.
+
+    Commas inside double quotes or <> are not separators.
+    '''
+    values = []
+    start = 0
+    quoted = False
+    escaped = False
+    bracketed = False
+    for index, char in enumerate(value):
+        if escaped:
+            escaped = False
+        elif quoted and char == '\\':
+            escaped = True
+        elif char == '"' and not bracketed:
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '<':
+            bracketed = True
+        elif char == '>':
+            bracketed = False
+        elif char == ',' and not bracketed:
+            values.append(value[start:index])
+            start = index + 1
+    values.append(value[start:])
+    return [part.strip() for part in values if part.strip()]
+
+
+def parse_header(hdr):
+    '''Parse a SIP URI in a header format.
+
+    Ex `Alice <sip:localhost>`
+    '''
+    result, error = _split_header(hdr)
+    if error:
+        raise ValueError(error.format(value=hdr))
+    return result._replace(uri=parse_header_uri(result.uri))
+
+
+def parse_header_uri(uri):
+    '''Parse the URI in a header, which is either a SIP or tel URI.'''
+    if uri.startswith('tel:'):
+        from .tel import TelURI
+        return TelURI(uri)
+    return URI(uri)
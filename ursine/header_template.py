@@ -0,0 +1,170 @@
+'''Precompiled headers for rendering many similar header values.'''
+import re
+import string
+import typing as t
+from .header import Header, HeaderError, random_tag
+from .uri import URIError
+from .uri_parsing import escape_user
+
+
+HOLES = ('display_name', 'user', 'tag')
+
+
+class HeaderTemplateError(Exception):
+    pass
+
+
+class HeaderTemplate:
+    '''A Header with named holes, compiled once and rendered many times.
+
+    The template is written like a header value, with `{user}`,
+    `{tag}` and `{display_name}` standing in for the URI user, the tag
+    parameter and the display name, eg.
+    `"{display_name}" <sip:{user}@example.com>;tag={tag}`.
+
+    Everything else is parsed, validated and put in its canonical form
+    (parameters sorted, default transport added) on construction, so
+    rendering only escapes the values filled in and joins them with
+    the preformatted fragments around them. A rendered value is
+    identical to `str()` of the equivalent built Header.
+    '''
+    __slots__ = (
+        '_header',
+        '_holes',
+        '_parts',
+        '_byte_parts',
+    )
+
+    def __init__(self, template: str):
+        # stand-ins that survive parsing and rendering untouched, so
+        # the rendered header can be split around them
+        tokens = {name: f'URSINEHOLE{n}X' for n, name in enumerate(HOLES)}
+        if any(token in template for token in tokens.values()):
+            raise HeaderTemplateError('template contains a reserved token')
+        source, used = self._substitute(template, tokens)
+        try:
+            header = Header(source)
+        except (ValueError, URIError, HeaderError) as exc:
+            raise HeaderTemplateError(f'invalid template: {exc}')
+        self._check_holes(header, used, tokens)
+
+        names = {token: name for name, token in tokens.items()}
+        pieces = re.split('(' + '|'.join(names) + ')', str(header))
+        holes = {}
+        for position in range(1, len(pieces), 2):
+            name = names[pieces[position]]
+            if name == 'display_name':
+                # the quotes and trailing space go with the display
+                # name, as a header without one renders neither
+                pieces[position - 1] = pieces[position - 1][:-1]
+                pieces[position + 1] = pieces[position + 1][2:]
+            holes[name] = position
+            pieces[position] = ''
+        self._header = header
+        self._holes = holes
+        self._parts = pieces
+        self._byte_parts = [piece.encode() for piece in pieces]
+
+    @staticmethod
+    def _substitute(template, tokens):
+        '''Replace each hole with its token, returning the names used.
+
+        Holes are plain names only: conversions (`{user!r}`), format
+        specs (`{user:>8}`) and attribute or index access are rejected.
+        '''
+        parts = []
+        used = set()
+        try:
+            fields = list(string.Formatter().parse(template))
+        except ValueError as exc:
+            raise HeaderTemplateError(f'invalid template: {exc}')
+        for literal, name, spec, conversion in fields:
+            parts.append(literal)
+            if name is None:
+                continue
+            if name not in tokens:
+                raise HeaderTemplateError(f'unknown hole `{name}` in template')
+            if spec or conversion:
+                raise HeaderTemplateError(
+                    f'hole `{name}` cannot have a conversion or format spec')
+            if name in used:
+                raise HeaderTemplateError(f'hole {name} used more than once')
+            used.add(name)
+            parts.append(tokens[name])
+        return ''.join(parts), used
+
+    @staticmethod
+    def _check_holes(header, used, tokens):
+        '''Ensure each hole used is in the one place it's allowed.'''
+        found = {
+            'display_name': header.display_name,
+            'user': getattr(header.uri, 'user', None),
+            'tag': header.tag,
+        }
+        for name in used:
+            if found[name] != tokens[name]:
+                raise HeaderTemplateError(
+                    f'hole {name} must be the whole {name.replace("_", " ")}')
+
+    holes = property(lambda self: tuple(self._holes))
+    header = property(lambda self: self._header)
+
+    def _values(self, display_name, user, tag):
+        '''Get the rendered value for each hole, by position.'''
+        holes = self._holes
+        values = []
+        if 'display_name' in holes:
+            if display_name:
+                if '"' in display_name:
+                    raise HeaderError('display name cannot contain `"`')
+                display_name = f'"{display_name}" '
+            else:
+                display_name = ''
+            values.append((holes['display_name'], display_name))
+        if 'user' in holes:
+            if not user:
+                raise HeaderTemplateError('a user is required')
+            values.append((holes['user'], escape_user(user)))
+        if 'tag' in holes:
+            values.append((holes['tag'], tag or random_tag()))
+        return values
+
+    def render(self, *,
+               user: t.Optional[str]=None,
+               tag: t.Optional[str]=None,
+               display_name: t.Optional[str]=None) -> str:
+        '''Render the header value with the holes filled in.
+
+        The user is plain text and is escaped as needed. A missing tag
+        is generated with `random_tag`, and a missing display name is
+        left out along with its quotes.
+        '''
+        parts = self._parts.copy()
+        for position, value in self._values(display_name, user, tag):
+            parts[position] = value
+        return ''.join(parts)
+
+    def render_into(self, buffer: bytearray, *,
+                    user: t.Optional[str]=None,
+                    tag: t.Optional[str]=None,
+                    display_name: t.Optional[str]=None) -> int:
+        '''Render the header value as UTF-8 onto the end of `buffer`.
+
+        Returns the number of bytes written.
+        '''
+        parts = self._byte_parts.copy()
+        for position, value in self._values(display_name, user, tag):
+            parts[position] = value.encode()
+        rendered = b''.join(parts)
+        buffer += rendered
+        return len(rendered)
+
+    def __str__(self):
+        parts = self._parts.copy()
+        for name, position in self._holes.items():
+            hole = f'{{{name}}}'
+            parts[position] = f'"{hole}" ' if name == 'display_name' else hole
+        return ''.join(parts)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self})'
@@ -0,0 +1,273 @@
+'''Locating SIP servers for a URI per RFC 3263.'''
+import asyncio
+import itertools
+import ipaddress
+import random
+import socket
+import time
+import typing as t
+from collections import namedtuple
+from .uri import URI
+
+
+Target = namedtuple('Target', (
+    'transport',
+    'host',
+    'port',
+))
+
+NAPTRRecord = namedtuple('NAPTRRecord', (
+    'order',
+    'preference',
+    'flags',
+    'service',
+    'regexp',
+    'replacement',
+    'ttl',
+))
+
+SRVRecord = namedtuple('SRVRecord', (
+    'priority',
+    'weight',
+    'port',
+    'target',
+    'ttl',
+))
+
+AddressRecord = namedtuple('AddressRecord', (
+    'address',
+    'ttl',
+))
+
+
+NAPTR_SERVICES = {
+    'SIP+D2U': ('udp', False),
+    'SIP+D2T': ('tcp', False),
+    'SIP+D2S': ('sctp', False),
+    'SIPS+D2T': ('tls', True),
+    'SIPS+D2S': ('tls-sctp', True),
+}
+
+SRV_PREFIXES = {
+    'udp': '_sip._udp',
+    'tcp': '_sip._tcp',
+    'sctp': '_sip._sctp',
+    'tls': '_sips._tcp',
+    'tls-sctp': '_sips._sctp',
+}
+
+
+class DNSBackend:
+    '''Interface for the DNS lookups the Resolver needs.
+
+    `query` is given a name and one of `NAPTR`, `SRV`, `A` or `AAAA`
+    and returns a list of NAPTRRecord, SRVRecord or AddressRecord
+    respectively. A name or type that does not exist is an empty list;
+    any other failure should raise.
+    '''
+
+    async def query(self, name: str, rtype: str) -> t.List[tuple]:
+        raise NotImplementedError
+
+
+class SystemBackend(DNSBackend):
+    '''A backend using the system resolver via getaddrinfo.
+
+    Only A/AAAA lookups are possible this way, so NAPTR and SRV always
+    come back empty, and since getaddrinfo exposes no TTLs every answer
+    gets `ttl`.
+    '''
+
+    def __init__(self, ttl: int=60):
+        self._ttl = ttl
+
+    async def query(self, name, rtype):
+        if rtype not in ('A', 'AAAA'):
+            return []
+        family = socket.AF_INET if rtype == 'A' else socket.AF_INET6
+        loop = asyncio.get_event_loop()
+        try:
+            infos = await loop.getaddrinfo(name, None, family=family,
+                                           type=socket.SOCK_DGRAM)
+        except socket.gaierror:
+            return []
+        addresses = dict.fromkeys(info[4][0] for info in infos)
+        return [AddressRecord(address, self._ttl) for address in addresses]
+
+
+class Resolver:
+    '''Turns URIs into ordered lists of (transport, ip, port) targets.
+
+    Lookups go through a cache honouring record TTLs (capped at
+    `max_ttl`); empty answers are cached for `negative_ttl`. The cache
+    holds at most `max_entries` answers: when it fills up, expired
+    answers are purged and, if that isn't enough, the oldest quarter
+    is dropped. Concurrent lookups of the same name and type share a
+    single backend query.
+
+    ursine always fills in a URI's transport, so a transport equal to
+    the scheme default is taken as unspecified and NAPTR is consulted.
+    '''
+
+    def __init__(self, backend: t.Optional[DNSBackend]=None, *,
+                 negative_ttl: float=30.0,
+                 max_ttl: float=3600.0,
+                 max_entries: int=10000,
+                 prefer_ipv6: bool=False,
+                 clock: t.Callable[[], float]=time.monotonic,
+                 rng: t.Optional[random.Random]=None):
+        self._backend = backend if backend else SystemBackend()
+        self._negative_ttl = negative_ttl
+        self._max_ttl = max_ttl
+        self._max_entries = max_entries
+        self._families = ('AAAA', 'A') if prefer_ipv6 else ('A', 'AAAA')
+        self._clock = clock
+        self._rng = rng if rng else random.Random()
+        self._cache = {}
+        self._inflight = {}
+
+    async def query(self, name: str, rtype: str) -> t.List[tuple]:
+        '''Look up records through the cache.'''
+        key = (name.lower().rstrip('.'), rtype)
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires, records = cached
+            if expires > self._clock():
+                return records
+            del self._cache[key]
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            # the backend query runs as its own task, so cancelling any
+            # one caller (even the first) leaves the others waiting on it
+            pending = asyncio.ensure_future(self._fetch(key))
+            self._inflight[key] = pending
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, key):
+        try:
+            records = await self._backend.query(*key)
+            ttl = (min(min(r.ttl for r in records), self._max_ttl)
+                   if records else self._negative_ttl)
+            now = self._clock()
+            if len(self._cache) >= self._max_entries:
+                self._purge(now)
+            self._cache[key] = (now + ttl, records)
+            return records
+        finally:
+            del self._inflight[key]
+
+    def _purge(self, now):
+        '''Make room in the cache, dropping expired then oldest answers.'''
+        cache = self._cache
+        for key in [key for key, (expires, _) in cache.items()
+                    if expires <= now]:
+            del cache[key]
+        excess = len(cache) - self._max_entries * 3 // 4
+        if excess > 0:
+            # dicts keep insertion order, so these were cached first
+            for key in list(itertools.islice(cache, excess)):
+                del cache[key]
+
+    def clear(self):
+        '''Drop every cached answer.'''
+        self._cache.clear()
+
+    async def resolve(self, uri: URI) -> t.List[Target]:
+        '''Get the ordered targets to try for a request to `uri`.'''
+        host = uri.parameters.get('maddr') or uri.host
+        secure = uri.scheme == 'sips'
+        transport = uri.transport.lower()
+        explicit = transport != ('tcp' if secure else 'udp')
+        if secure and transport == 'tcp':
+            transport = 'tls'
+        port_part = uri.hostport[len(uri.host):]
+        port = int(port_part[1:]) if port_part.startswith(':') else None
+
+        address = _ip_literal(host)
+        if address is not None:
+            return [Target(transport, address,
+                           port or _default_port(transport))]
+        if port is not None:
+            return await self._addresses(transport, host, port)
+
+        if not explicit:
+            targets = await self._naptr(host, secure)
+            if targets is not None:
+                return targets
+            transports = ('tls',) if secure else ('udp', 'tcp', 'tls')
+        else:
+            transports = (transport,)
+
+        targets = []
+        for candidate in transports:
+            targets.extend(await self._srv(candidate, host))
+        if targets:
+            return targets
+        return await self._addresses(transport, host,
+                                     _default_port(transport))
+
+    async def _naptr(self, host, secure):
+        '''Follow NAPTR records, or return None if there are none usable.'''
+        records = [r for r in await self.query(host, 'NAPTR')
+                   if r.flags.lower() == 's' and
+                   r.service.upper() in NAPTR_SERVICES and
+                   (NAPTR_SERVICES[r.service.upper()][1] or not secure)]
+        if not records:
+            return None
+        records.sort(key=lambda r: (r.order, r.preference))
+        targets = []
+        for record in records:
+            transport = NAPTR_SERVICES[record.service.upper()][0]
+            for srv in self._srv_order(
+                    await self.query(record.replacement, 'SRV')):
+                targets.extend(await self._addresses(
+                    transport, srv.target, srv.port))
+        return targets
+
+    async def _srv(self, transport, host):
+        targets = []
+        if transport not in SRV_PREFIXES:
+            return targets
+        name = f'{SRV_PREFIXES[transport]}.{host}'
+        for srv in self._srv_order(await self.query(name, 'SRV')):
+            targets.extend(await self._addresses(
+                transport, srv.target, srv.port))
+        return targets
+
+    def _srv_order(self, records):
+        '''Order SRV records by priority, then weighted random (RFC 2782).'''
+        ordered = []
+        records = [r for r in records if r.target not in ('', '.')]
+        for priority in sorted({r.priority for r in records}):
+            group = [r for r in records if r.priority == priority]
+            group.sort(key=lambda r: r.weight)
+            while group:
+                total = sum(r.weight for r in group)
+                pick = self._rng.uniform(0, total)
+                running = 0
+                for index, record in enumerate(group):
+                    running += record.weight
+                    if running >= pick:
+                        break
+                ordered.append(group.pop(index))
+        return ordered
+
+    async def _addresses(self, transport, host, port):
+        answers = await asyncio.gather(*[self.query(host, rtype)
+                                         for rtype in self._families])
+        return [Target(transport, record.address, port)
+                for records in answers
+                for record in records]
+
+
+def _ip_literal(host):
+    '''Get the address if `host` is an IPv4/IPv6 literal.'''
+    try:
+        return str(ipaddress.ip_address(host.strip('[]')))
+    except ValueError:
+        return None
+
+
+def _default_port(transport):
+    return 5061 if transport.startswith('tls') else 5060
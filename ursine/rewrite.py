@@ -0,0 +1,406 @@
+'''Compiled rewrite rules for URIs and Headers.'''
+import re
+import typing as t
+from multidict import MultiDict
+from .header import Header, random_tag
+from .uri import URI
+from .uri_parsing import escape_user
+
+
+_UNSET = object()
+
+URI_FIELDS = frozenset((
+    'user',
+    'host',
+    'port',
+    'uri_parameters',
+    'uri_headers',
+))
+
+
+class RewriteError(Exception):
+    pass
+
+
+class Rule:
+    '''A declarative rewrite rule.
+
+    A rule applies when all of its conditions hold: `match_scheme`,
+    `match_host` (compared case-insensitively) and `match_user`, a
+    regex that must match the whole user part (a URI without a user
+    is matched as the empty string).
+
+    Actions:
+
+    - `user`: the new (plain text) user, expanded as a template against the
+      `match_user` match if there is one (`\\1`, `\\g<name>`), else
+      taken literally; None drops the userinfo
+    - `host`, `port`: replacements for the hostport parts
+    - `strip_parameters`, `strip_headers`: names of URI parameters or
+      headers to drop, or `'*'` for all of them (the transport is kept)
+    - `parameters`, `headers`: URI parameters or headers to set
+    - `display_name`: the new display name, None to drop it
+    - `tag`: a tag to set, True to ensure one (like `Header.with_tag`),
+      False to drop it
+    - `strip_header_parameters`, `header_parameters`: as above for the
+      Header's own parameters
+    '''
+    __slots__ = (
+        'match_scheme',
+        'match_host',
+        'match_user',
+        'user',
+        'host',
+        'port',
+        'strip_parameters',
+        'parameters',
+        'strip_headers',
+        'headers',
+        'display_name',
+        'tag',
+        'strip_header_parameters',
+        'header_parameters',
+        '_user_re',
+        '_fields',
+    )
+
+    def __init__(self, *,
+                 match_scheme: t.Optional[str]=None,
+                 match_host: t.Optional[str]=None,
+                 match_user: t.Optional[str]=None,
+                 user: t.Any=_UNSET,
+                 host: t.Optional[str]=None,
+                 port: t.Optional[int]=None,
+                 strip_parameters: t.Iterable[str]=(),
+                 parameters: t.Optional[t.Dict[str, str]]=None,
+                 strip_headers: t.Iterable[str]=(),
+                 headers: t.Optional[t.Dict[str, str]]=None,
+                 display_name: t.Any=_UNSET,
+                 tag: t.Union[str, bool, None]=None,
+                 strip_header_parameters: t.Iterable[str]=(),
+                 header_parameters: t.Optional[t.Dict[str, str]]=None):
+        self.match_scheme = match_scheme
+        self.match_host = match_host.lower() if match_host else None
+        self.match_user = match_user
+        self.user = user
+        self.host = host
+        self.port = port
+        self.strip_parameters = frozenset(strip_parameters)
+        self.parameters = dict(parameters) if parameters else {}
+        self.strip_headers = frozenset(strip_headers)
+        self.headers = dict(headers) if headers else {}
+        self.display_name = display_name
+        self.tag = tag
+        self.strip_header_parameters = frozenset(strip_header_parameters)
+        self.header_parameters = (dict(header_parameters)
+                                  if header_parameters else {})
+        try:
+            self._user_re = re.compile(match_user) if match_user else None
+        except re.error as exc:
+            raise RewriteError(f'invalid user pattern `{match_user}`: {exc}')
+
+        fields = set()
+        if user is not _UNSET:
+            fields.add('user')
+        if host is not None:
+            fields.add('host')
+        if port is not None:
+            fields.add('port')
+        if self.strip_parameters or self.parameters:
+            fields.add('uri_parameters')
+        if self.strip_headers or self.headers:
+            fields.add('uri_headers')
+        if display_name is not _UNSET:
+            fields.add('display_name')
+        if tag is not None:
+            fields.add('tag')
+        if self.strip_header_parameters or self.header_parameters:
+            fields.add('header_parameters')
+        self._fields = frozenset(fields)
+
+    fields = property(lambda self: self._fields)
+
+    def __repr__(self):
+        conditions = ', '.join(
+            f'{name}={getattr(self, name)!r}'
+            for name in ('match_scheme', 'match_host', 'match_user')
+            if getattr(self, name) is not None)
+        return f'{self.__class__.__name__}({conditions})'
+
+
+# `\1` or `(?(1)...)`, which depend on where the group is in the pattern
+numbered_group_re = re.compile(r'\\[1-9]|\(\?\([0-9]')
+
+
+class _Bucket:
+    '''The rules sharing a scheme/host condition, with a merged matcher.
+
+    The user patterns are merged into a single regex so one match finds
+    the first applicable rule. Literal prefixes are factored out into a
+    trie so rules that can't match are skipped a character at a time
+    rather than tried one by one. Patterns that can't be merged (e.g.
+    clashing group names, or numbered backreferences, which would point
+    at the wrong group once renumbered) fall back to being tried in
+    order.
+    '''
+    __slots__ = ('_merged', '_sequential')
+
+    def __init__(self, indices, rules):
+        self._merged = None
+        self._sequential = None
+        items = [(i, *_literal_prefix(rules[i].match_user or '.*'))
+                 for i in indices]
+        try:
+            if any(numbered_group_re.search(rules[i].match_user or '')
+                   for i in indices):
+                raise re.error('numbered group reference')
+            self._merged = re.compile(_merge_patterns(items, 0))
+        except re.error:
+            self._sequential = [(i, rules[i]._user_re) for i in indices]
+
+    def first(self, user):
+        '''Get the index of the first rule whose user pattern matches.'''
+        if self._merged is not None:
+            match = self._merged.fullmatch(user)
+            return int(match.lastgroup[2:]) if match else None
+        for index, user_re in self._sequential:
+            if user_re is None or user_re.fullmatch(user):
+                return index
+        return None
+
+
+def _literal_prefix(pattern):
+    '''Split a pattern into its leading literal text and the rest.'''
+    if '|' in pattern:
+        return '', pattern
+    literal = []
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if (char == '\\' and pos + 1 < len(pattern) and
+                not pattern[pos + 1].isalnum()):
+            token, size = pattern[pos + 1], 2
+        elif char.isalnum() or char in '_-@:%!~':
+            token, size = char, 1
+        else:
+            break
+        # a quantified character isn't a fixed part of the prefix
+        if pattern[pos + size:pos + size + 1] in ('*', '?', '{', '+'):
+            break
+        literal.append(token)
+        pos += size
+    return ''.join(literal), pattern[pos:]
+
+
+def _merge_patterns(items, depth):
+    '''Build a trie-shaped alternation from (index, prefix, rest) items.
+
+    Items sharing the next prefix character are grouped, except across a
+    rule whose prefix ends here: that rule could match the same input as
+    both, so the order of the rules around it is kept.
+    '''
+    alternatives = []
+    groups = {}
+    for item in items:
+        index, prefix, rest = item
+        if len(prefix) == depth:
+            alternatives.append((None, item))
+            groups = {}
+            continue
+        char = prefix[depth]
+        group = groups.get(char)
+        if group is None:
+            group = groups[char] = []
+            alternatives.append((char, group))
+        group.append(item)
+    parts = []
+    for char, payload in alternatives:
+        if char is None:
+            index, _, rest = payload
+            parts.append(f'(?P<_r{index}>{rest})')
+        else:
+            parts.append(re.escape(char) + _merge_patterns(payload, depth + 1))
+    if len(parts) == 1:
+        return parts[0]
+    return '(?:' + '|'.join(parts) + ')'
+
+
+class Rewriter:
+    '''A compiled, ordered set of rewrite rules.
+
+    The first rule whose conditions hold is applied, and all of its
+    actions are applied at once: the result is built in a single step
+    rather than through a chain of `with_*` calls, and parts a rule
+    doesn't touch are shared with the input. Headers holding a tel
+    URI are never matched and come back unchanged.
+    '''
+
+    def __init__(self, rules: t.Iterable[Rule]):
+        self._rules = list(rules)
+        grouped = {}
+        for index, rule in enumerate(self._rules):
+            key = (rule.match_scheme, rule.match_host)
+            grouped.setdefault(key, []).append(index)
+        self._buckets = {key: _Bucket(indices, self._rules)
+                         for key, indices in grouped.items()}
+
+    rules = property(lambda self: list(self._rules))
+
+    def __len__(self):
+        return len(self._rules)
+
+    def _match_index(self, scheme, host, user):
+        buckets = self._buckets
+        host = host.lower()
+        best = None
+        for key in ((scheme, host), (scheme, None),
+                    (None, host), (None, None)):
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+            index = bucket.first(user)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+    def match(self, uri: URI) -> t.Optional[Rule]:
+        '''Get the rule that applies to `uri`, if any.'''
+        if not isinstance(uri, URI):
+            # rules only apply to SIP URIs, so eg. tel URIs never match
+            return None
+        index = self._match_index(uri.scheme, uri.host, uri.user or '')
+        return None if index is None else self._rules[index]
+
+    def rewrite_uri(self, uri: URI) -> URI:
+        '''Apply the matching rule's URI actions to `uri`.'''
+        rule = self.match(uri)
+        if rule is None:
+            return uri
+        return self._apply_uri(rule, uri)
+
+    def rewrite(self, header: Header) -> Header:
+        '''Apply the matching rule to `header` and its URI.'''
+        rule = self.match(header.uri)
+        if rule is None:
+            return header
+        return self._apply(rule, header)
+
+    def rewrite_many(self, headers: t.Iterable[Header]) -> t.List[Header]:
+        '''Rewrite a batch of headers.
+
+        Rule selection is shared between headers with the same scheme,
+        host and user, so repeated URIs are only matched once.
+        '''
+        rules = self._rules
+        apply = self._apply
+        match_index = self._match_index
+        selected = {}
+        result = []
+        for header in headers:
+            uri = header.uri
+            if not isinstance(uri, URI):
+                result.append(header)
+                continue
+            key = (uri.scheme, uri.host, uri.user or '')
+            try:
+                index = selected[key]
+            except KeyError:
+                index = selected[key] = match_index(*key)
+            result.append(header if index is None
+                          else apply(rules[index], header))
+        return result
+
+    def _apply_uri(self, rule, uri):
+        fields = rule._fields
+        if not fields & URI_FIELDS:
+            return uri
+        new = object.__new__(URI)
+        new._scheme = uri._scheme
+
+        if 'user' in fields:
+            user = rule.user
+            if user is not None and rule._user_re is not None:
+                user = rule._user_re.fullmatch(uri.user or '').expand(user)
+            password = uri.escaped_password
+            if user is None:
+                new._userinfo = None
+            elif password is not None:
+                new._userinfo = f'{escape_user(user)}:{password}'
+            else:
+                new._userinfo = escape_user(user)
+            new._userinfo_forms = None
+        else:
+            new._userinfo = uri._userinfo
+            new._userinfo_forms = uri._userinfo_forms
+
+        if 'host' in fields or 'port' in fields:
+            host = rule.host if rule.host is not None else uri.host
+            port_part = uri._hostport[len(uri.host):]
+            if rule.port is not None:
+                port_part = f':{rule.port}'
+            new._hostport = f'{host}{port_part}'
+        else:
+            new._hostport = uri._hostport
+
+        if 'uri_parameters' in fields:
+            new._parameters = _rewrite_mapping(
+                uri._parameters, rule.strip_parameters, rule.parameters,
+                keep='transport')
+            if new._parameters.get('transport') is None:
+                new._parameters['transport'] = new._default_transport()
+        else:
+            new._parameters = uri._parameters
+
+        if 'uri_headers' in fields:
+            strip = rule.strip_headers
+            new._headers = MultiDict(
+                () if '*' in strip else
+                [(k, v) for k, v in (uri._headers or {}).items()
+                 if k not in strip])
+            for key, val in rule.headers.items():
+                new._headers[key] = val
+        else:
+            new._headers = uri._headers
+
+        new._validate()
+        return new
+
+    def _apply(self, rule, header):
+        fields = rule._fields
+        new = object.__new__(Header)
+        new._uri = self._apply_uri(rule, header._uri)
+        if 'display_name' in fields:
+            new._display_name = rule.display_name
+        else:
+            new._display_name = header._display_name
+
+        if 'header_parameters' in fields or 'tag' in fields:
+            parameters = _rewrite_mapping(
+                header._parameters, rule.strip_header_parameters,
+                rule.header_parameters)
+            tag = rule.tag
+            if tag is False:
+                parameters.pop('tag', None)
+            elif tag is True:
+                if not parameters.get('tag'):
+                    parameters['tag'] = random_tag()
+            elif tag is not None:
+                parameters['tag'] = tag
+            new._parameters = parameters
+        else:
+            new._parameters = header._parameters
+
+        if 'display_name' in fields:
+            new._validate()
+        return new
+
+
+def _rewrite_mapping(mapping, strip, updates, keep=None):
+    if '*' in strip:
+        result = {keep: mapping[keep]} if keep in mapping else {}
+    elif strip:
+        result = {k: v for k, v in mapping.items() if k not in strip}
+    else:
+        result = dict(mapping)
+    result.update(updates)
+    return result
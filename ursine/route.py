@@ -0,0 +1,129 @@
+import typing as t
+from collections import namedtuple
+from multidict import MultiDict
+from .header import Header
+from .header_parsing import split_header_list
+from .uri import URI
+
+
+Routing = namedtuple('Routing', (
+    'request_uri',
+    'route_set',
+    'next_hop',
+))
+
+
+class RouteSetError(Exception):
+    pass
+
+
+class RouteSet:
+    '''An ordered set of Route (or Record-Route) values.
+
+    The whole field value is parsed once into Headers, and whether the
+    first hop is a loose router is decided on construction, so routing
+    a request only has to look at cached state.
+    '''
+    __slots__ = (
+        '_routes',
+        '_loose',
+    )
+
+    def __init__(self, routes: str=''):
+        self._assign(tuple(Header(route)
+                           for route in split_header_list(routes)))
+
+    @classmethod
+    def build(cls, routes: t.Iterable[t.Union[Header, URI]]) -> 'RouteSet':
+        '''Build a RouteSet from Headers (or bare URIs).'''
+        self = object.__new__(cls)
+        self._assign(tuple(route if isinstance(route, Header)
+                           else Header.build(uri=route)
+                           for route in routes))
+        return self
+
+    @classmethod
+    def parse_list(cls, fields: t.Iterable[str]) -> 'RouteSet':
+        '''Parse a route set spread across several header fields.'''
+        return cls(', '.join(fields))
+
+    def _assign(self, routes):
+        for route in routes:
+            if not isinstance(route.uri, URI):
+                raise RouteSetError(f'route {route} is not a SIP URI')
+        self._routes = routes
+        self._loose = bool(routes) and 'lr' in routes[0].uri.parameters
+
+    routes = property(lambda self: self._routes)
+    loose = property(lambda self: self._loose)
+
+    @property
+    def next_hop(self) -> t.Optional[URI]:
+        '''The URI of the first hop, or None for an empty route set.'''
+        return self._routes[0].uri if self._routes else None
+
+    def route(self, remote_target: URI) -> Routing:
+        '''Decide how to send a request to `remote_target` (RFC 3261 12.2.1.1).
+
+        With a loose first hop the request goes to it unchanged. With a
+        strict router the first hop becomes the Request-URI, and the
+        remote target is moved to the end of the Route set.
+        '''
+        if not self._routes:
+            return Routing(remote_target, self, remote_target)
+        first = self._routes[0].uri
+        if self._loose:
+            return Routing(remote_target, self, first)
+        request_uri = first.with_headers(MultiDict())
+        route_set = RouteSet.build(self._routes[1:] +
+                                   (Header.build(uri=remote_target),))
+        return Routing(request_uri, route_set, request_uri)
+
+    def prepend(self, route: t.Union[Header, URI]) -> 'RouteSet':
+        '''Create a new RouteSet from `self` with `route` first.'''
+        if not isinstance(route, Header):
+            route = Header.build(uri=route)
+        new = object.__new__(self.__class__)
+        new._assign((route,) + self._routes)
+        return new
+
+    def pop(self) -> t.Tuple[Header, 'RouteSet']:
+        '''Split off the first route, returning it and the remainder.'''
+        if not self._routes:
+            raise RouteSetError('cannot pop from an empty route set')
+        new = object.__new__(self.__class__)
+        new._assign(self._routes[1:])
+        return self._routes[0], new
+
+    def reversed(self) -> 'RouteSet':
+        '''Create a new RouteSet in reverse order.
+
+        A UAC builds its route set from Record-Route in reverse.
+        '''
+        new = object.__new__(self.__class__)
+        new._assign(self._routes[::-1])
+        return new
+
+    def __len__(self):
+        return len(self._routes)
+
+    def __iter__(self):
+        return iter(self._routes)
+
+    def __getitem__(self, index):
+        return self._routes[index]
+
+    def __bool__(self):
+        return bool(self._routes)
+
+    def __str__(self):
+        return ', '.join(str(route) for route in self._routes)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self})'
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
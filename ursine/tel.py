@@ -0,0 +1,175 @@
+import copy
+import typing as t
+from .tel_parsing import (
+    global_number_re,
+    local_number_re,
+    parse_tel,
+    strip_separators,
+)
+from .uri import URI
+
+
+class TelURIError(Exception):
+    pass
+
+
+class TelURI:
+    '''A tel URI (RFC 3966).'''
+    __slots__ = (
+        '_number',
+        '_parameters',
+        '_e164',
+    )
+
+    def __init__(self, uri: str):
+        result = parse_tel(uri)
+        self._number = result.number
+        self._parameters = result.parameters
+        # a 1-tuple once computed, as the E.164 form itself may be None
+        self._e164 = None
+        self._validate()
+
+    @classmethod
+    def build(cls, *,
+              number: str,
+              phone_context: t.Optional[str]=None,
+              parameters: t.Optional[t.Dict[str, t.Optional[str]]]=None,
+              ) -> 'TelURI':
+        '''Build a tel URI from a number and parameters.'''
+        self = object.__new__(cls)
+        self._number = number
+        self._parameters = dict(parameters) if parameters else {}
+        if phone_context:
+            self._parameters['phone-context'] = phone_context
+        self._e164 = None
+        self._validate()
+        return self
+
+    @classmethod
+    def try_parse(cls, uri: str) -> t.Optional['TelURI']:
+        '''Parse a tel URI, returning None rather than raising if invalid.'''
+        try:
+            return cls(uri)
+        except (ValueError, TelURIError):
+            return None
+
+    @classmethod
+    def from_uri(cls, uri: URI) -> t.Optional['TelURI']:
+        '''Get the tel URI carried by a SIP URI with `user=phone`.'''
+        if uri.parameters.get('user') != 'phone' or not uri.user:
+            return None
+        return cls(f'tel:{uri.user}')
+
+    scheme = property(lambda self: 'tel')
+    number = property(lambda self: self._number)
+    parameters = property(lambda self: self._parameters)
+    phone_context = property(
+        lambda self: self._parameters.get('phone-context', None))
+    extension = property(lambda self: self._parameters.get('ext', None))
+    is_global = property(lambda self: self._number.startswith('+'))
+
+    @property
+    def e164(self) -> t.Optional[str]:
+        '''The number in E.164 form (`+` and digits only), if it has one.
+
+        Global numbers just lose their separators. Local numbers get
+        their phone-context prepended when that's a global number
+        prefix; local numbers in a domain context have no E.164 form.
+        Computed once and cached.
+        '''
+        if self._e164 is None:
+            self._e164 = (self._normalize(),)
+        return self._e164[0]
+
+    def _normalize(self):
+        number = strip_separators(self._number)
+        if self.is_global:
+            return number
+        context = self.phone_context
+        if not context or not context.startswith('+') or \
+                not number.isdigit():
+            return None
+        return strip_separators(context) + number
+
+    def _validate(self):
+        '''Ensure correctness of properties.'''
+        if self.is_global:
+            if not global_number_re.fullmatch(self._number):
+                raise TelURIError(f'invalid global number {self._number}')
+        else:
+            if not local_number_re.fullmatch(self._number):
+                raise TelURIError(f'invalid local number {self._number}')
+            context = self.phone_context
+            if not context:
+                raise TelURIError('local numbers require a phone-context')
+            if context.startswith('+') and \
+                    not global_number_re.fullmatch(context):
+                raise TelURIError(f'invalid phone-context {context}')
+
+    def with_number(self, number: str):
+        '''Create a new TelURI from `self` with a specific number.'''
+        new = copy.copy(self)
+        new._number = number
+        new._validate()
+        return new
+
+    def with_parameters(self, parameters: t.Dict[str, t.Optional[str]]):
+        '''Create a new TelURI from `self` with specific parameters.'''
+        new = copy.copy(self)
+        new._parameters = parameters
+        new._validate()
+        return new
+
+    def __str__(self):
+        param_pairs = ';'.join([k if v is None else '='.join([k, v])
+                                for k, v in sorted(self._parameters.items())])
+        params = f';{param_pairs}' if param_pairs else ''
+        return f'tel:{self._number}{params}'
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self})'
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __copy__(self):
+        new = object.__new__(self.__class__)
+        new._number = self._number
+        new._parameters = copy.copy(self._parameters)
+        new._e164 = None
+        return new
+
+
+def e164(uri: t.Union[TelURI, URI, str]) -> t.Optional[str]:
+    '''Get the E.164 form of a tel URI or a SIP URI with `user=phone`.
+
+    Strings are parsed as tel URIs. Anything that doesn't carry a
+    telephone number, or is invalid, gives None.
+    '''
+    if isinstance(uri, TelURI):
+        return uri.e164
+    if isinstance(uri, URI):
+        try:
+            tel = TelURI.from_uri(uri)
+        except (ValueError, TelURIError):
+            return None
+    else:
+        tel = TelURI.try_parse(uri)
+    return tel.e164 if tel is not None else None
+
+
+def normalize_many(uris: t.Iterable[t.Union[TelURI, URI, str]]
+                   ) -> t.List[t.Optional[str]]:
+    '''Get the E.164 form of many URIs, normalizing each distinct one once.'''
+    cache = {}
+    result = []
+    for uri in uris:
+        try:
+            number = cache[uri]
+        except KeyError:
+            number = cache[uri] = e164(uri)
+        result.append(number)
+    return result
@@ -0,0 +1,40 @@
+'''Parsing for tel URIs (RFC 3966).'''
+from collections import namedtuple
+import re
+
+
+TelParseResult = namedtuple('TelParseResult', (
+    'number',
+    'parameters',
+))
+
+
+global_number_re = re.compile(r'\+[0-9\-.()]*[0-9][0-9\-.()]*')
+local_number_re = re.compile(r'[0-9A-Fa-f*#\-.()]*'
+                             r'[0-9A-Fa-f*#]'
+                             r'[0-9A-Fa-f*#\-.()]*')
+separators_re = re.compile(r'[\-.()]')
+
+
+def strip_separators(number):
+    '''Remove the visual separators (`-.()`) from a phone number.'''
+    return separators_re.sub('', number)
+
+
+def parse_tel(uri):
+    '''Parse a tel URI into its number and parameters.
+
+    Ex `tel:+1-201-555-0123;ext=42`
+    '''
+    scheme, colon, rest = uri.partition(':')
+    if not colon or scheme != 'tel':
+        raise ValueError(f"'{uri}' is not a valid tel URI")
+    number, _, params_str = rest.partition(';')
+    parameters = {}
+    if params_str:
+        for pair in params_str.split(';'):
+            key, eq, val = pair.partition('=')
+            if not key or (eq and not val):
+                raise ValueError(f'invalid tel uri parameter `{pair}`')
+            parameters[key.lower()] = val if eq else None
+    return TelParseResult(number=number, parameters=parameters)
@@ -1,7 +1,18 @@
 import copy
 import typing as t
-from multidict import MultiDict
-from .uri_parsing import parse_uri
+from .uri_parsing import (
+    bad_escape_re,
+    escape_password,
+    escape_user,
+    new_multidict,
+    parse_uri,
+    parse_userinfo,
+    prefilter_uri,
+    _parse_uri,
+)
+
+if t.TYPE_CHECKING:
+    from multidict import MultiDict
 
 
 class URIError(Exception):
@@ -16,18 +27,40 @@ class URI:
         '_hostport',
         '_parameters',
         '_headers',
+        '_userinfo_forms',
     )
 
     def __init__(self, uri: str):
-        result = parse_uri(uri)
+        self._assign(parse_uri(uri))
+        self._validate()
+
+    @classmethod
+    def try_parse(cls, uri: str) -> t.Optional['URI']:
+        '''Parse a URI, returning None rather than raising if invalid.
+
+        Obviously malformed input is rejected by `prefilter_uri` before
+        any parsing, which keeps the cost of garbage input low.
+        '''
+        if not prefilter_uri(uri):
+            return None
+        result, error = _parse_uri(uri)
+        if error:
+            return None
+        self = object.__new__(cls)
+        self._assign(result)
+        if self._check():
+            return None
+        return self
+
+    def _assign(self, result):
         self._scheme = result.scheme
         self._userinfo = result.userinfo
         self._hostport = result.hostport
         self._parameters = result.parameters
         self._headers = result.headers
+        self._userinfo_forms = None
         if self._parameters.get('transport') is None:
             self._parameters['transport'] = self._default_transport()
-        self._validate()
 
     @classmethod
     def build(cls, *,
@@ -39,7 +72,7 @@ class URI:
               port: t.Optional[int]=None,
               hostport: t.Optional[str]=None,
               parameters: t.Optional[dict]=None,
-              headers: t.Optional[MultiDict]=None,
+              headers: t.Optional['MultiDict']=None,
               transport: t.Optional[str]=None,
               ) -> 'URI':
         '''Build a URI from individual pieces.
@@ -48,6 +81,9 @@ class URI:
         down into user/password and host/port respectively
         for convenience, and similarly the transport
         parameter is offered as an argument for convenience.
+
+        The user and password are plain text and will be escaped as
+        needed, whereas userinfo is taken as already escaped.
         '''
         if (user or password) and userinfo:
             raise URIError('userinfo and user/password'
@@ -64,11 +100,13 @@ class URI:
             self._userinfo = userinfo
         elif user:
             if password:
-                self._userinfo = f'{user}:{password}'
+                self._userinfo = (f'{escape_user(user)}:'
+                                  f'{escape_password(password)}')
             else:
-                self._userinfo = user
+                self._userinfo = escape_user(user)
         else:
             self._userinfo = None
+        self._userinfo_forms = None
         if hostport:
             self._hostport = hostport
         elif host:
@@ -78,11 +116,12 @@ class URI:
                 self._hostport = host
         else:
             self._hostport = None
-        self._parameters = parameters if parameters else {}
-        self._headers = headers if headers else MultiDict()
+        # copied so that no two URIs (or a URI and its caller) share state
+        self._parameters = dict(parameters) if parameters else {}
+        self._headers = new_multidict(headers) if headers else None
         if transport:
             self._parameters['transport'] = transport
-        else:
+        elif self._parameters.get('transport') is None:
             self._parameters['transport'] = self._default_transport()
         self._validate()
         return self
@@ -91,26 +130,48 @@ class URI:
     userinfo = property(lambda self: self._userinfo)
     hostport = property(lambda self: self._hostport)
     parameters = property(lambda self: self._parameters)
-    headers = property(lambda self: self._headers)
     transport = property(lambda self: self._parameters['transport'])
 
+    @property
+    def headers(self) -> 'MultiDict':
+        '''The URI headers, as a MultiDict.'''
+        if self._headers is None:
+            # no headers were given, so multidict may not be imported yet
+            self._headers = new_multidict()
+        return self._headers
+
+    def _forms(self):
+        '''Get the decoded/escaped user and password, computed once.'''
+        forms = self._userinfo_forms
+        if forms is None or forms.userinfo is not self._userinfo:
+            forms = self._userinfo_forms = parse_userinfo(self._userinfo)
+        return forms
+
     @property
     def user(self):
-        if self._userinfo is None or ':' not in self._userinfo:
-            return self._userinfo
-        else:
-            return self._userinfo.split(':')[0]
+        '''The user, with any escapes decoded.'''
+        return self._forms().user
 
     @property
     def password(self):
-        if self._userinfo is None or ':' not in self._userinfo:
-            return None
-        else:
-            return self._userinfo.split(':')[1]
+        '''The password, with any escapes decoded.'''
+        return self._forms().password
+
+    @property
+    def escaped_user(self):
+        '''The user, canonically escaped.'''
+        return self._forms().escaped_user
+
+    @property
+    def escaped_password(self):
+        '''The password, canonically escaped.'''
+        return self._forms().escaped_password
 
     @property
     def host(self):
-        if ':' in self._hostport:
+        if self._hostport.startswith('[') and ']' in self._hostport:
+            return self._hostport[:self._hostport.index(']') + 1]
+        elif ':' in self._hostport:
             return self._hostport.split(':')[0]
         else:
             return self._hostport
@@ -128,18 +189,49 @@ class URI:
         else:
             return self._default_port()
 
+    @property
+    def aor(self):
+        '''The address-of-record form of the URI.
+
+        `scheme:user@host[:port]`, with the host lowercased and the
+        password, parameters and headers dropped.
+        '''
+        host = self.host
+        port_part = self._hostport[len(host):]
+        user = self.escaped_user
+        userinfo = f'{user}@' if user else ''
+        return f'{self._scheme}:{userinfo}{host.lower()}{port_part}'
+
+    def _check(self):
+        '''Check the correctness of properties, returning any error.
+
+        Errors are returned unformatted, and only filled in with the
+        offending values by `_validate`.
+        '''
+        if self._scheme not in ('sip', 'sips'):
+            return 'scheme is a required to be either `sip` or `sips`'
+        if self._hostport is None or not self.host:
+            return 'host is a required attribute'
+        if '@' in self._hostport:
+            return 'invalid hostport: {hostport}'
+        if self._userinfo and '%' in self._userinfo and \
+                bad_escape_re.search(self._userinfo):
+            return 'invalid escape in userinfo: {userinfo}'
+        port_part = self._hostport[len(self.host):]
+        if port_part:
+            port = port_part[1:]
+            if not port_part.startswith(':') or not port.isdecimal():
+                return 'invalid port in hostport: {hostport}'
+            if int(port) not in range(1, 2**16):
+                return 'port out of range in hostport: {hostport}'
+        return None
+
     def _validate(self):
         '''Ensure correctness of properties.'''
-        if self._scheme not in ('sip', 'sips'):
-            raise URIError('scheme is a required to be either `sip` or `sips`')
-        if self._hostport is None:
-            raise URIError('host is a required attribute')
-        if ':' in self._hostport:
-            try:
-                if self.port not in range(1, 2**16):
-                    raise URIError(f'invalid port {self.port}')
-            except ValueError:
-                raise URIError(f'invalid port in hostport: {self._hostport}')
+        error = self._check()
+        if error:
+            raise URIError(error.format(hostport=self._hostport,
+                                        userinfo=self._userinfo))
 
     def _default_port(self):
         '''Get the default port for ourselves.'''
@@ -164,21 +256,30 @@ class URI:
         return new
 
     def with_user(self, user: t.Optional[str]):
-        '''Create a new URI from `self` with a specific user.'''
+        '''Create a new URI from `self` with a specific (plain text) user.'''
         new = copy.copy(self)
-        if self.password:
-            new._userinfo = f'{user}:{self.password}'
+        if user is None:
+            new._userinfo = None
+        elif self.password:
+            new._userinfo = f'{escape_user(user)}:{self.escaped_password}'
         else:
-            new._userinfo = user
+            new._userinfo = escape_user(user)
         new._validate()
         return new
 
     def with_password(self, password: t.Optional[str]):
-        '''Create a new URI from `self` with a specific password.'''
+        '''Create a new URI from `self` with a specific password.
+
+        The password is plain text and will be escaped as needed.
+        '''
         new = copy.copy(self)
         if self.user is None:
             raise URIError('cannot set password without user')
-        new._userinfo = f'{self.user}:{password}'
+        if password is None:
+            new._userinfo = self.escaped_user
+        else:
+            new._userinfo = (f'{self.escaped_user}:'
+                             f'{escape_password(password)}')
         new._validate()
         return new
 
@@ -216,7 +317,7 @@ class URI:
         new._validate()
         return new
 
-    def with_headers(self, headers: MultiDict):
+    def with_headers(self, headers: 'MultiDict'):
         '''Create a new URI from `self` with specific headers.'''
         new = copy.copy(self)
         new._headers = headers
@@ -235,17 +336,28 @@ class URI:
         return self.__str__(short=True)
 
     def __str__(self, short: bool=False):
-        userinfo = f'{self._userinfo}@' if self._userinfo else ''
+        if self._userinfo:
+            forms = self._forms()
+            if forms.escaped_password is None:
+                userinfo = f'{forms.escaped_user}@'
+            else:
+                userinfo = (f'{forms.escaped_user}:'
+                            f'{forms.escaped_password}@')
+        else:
+            userinfo = ''
         if short:
             params = ''
             headers = ''
         else:
-            param_pairs = ';'.join(['='.join([k, v])
+            param_pairs = ';'.join([k if v is None else '='.join([k, v])
                                     for k, v in sorted(self._parameters.items())])
-            header_pairs = '&'.join(['='.join([k, v])
-                                     for k, v in sorted(self._headers.items())])
             params = f';{param_pairs}'
-            headers = f'?{header_pairs}' if len(header_pairs) else ''
+            if self._headers:
+                header_pairs = '&'.join(['='.join([k, v]) for k, v
+                                         in sorted(self._headers.items())])
+                headers = f'?{header_pairs}'
+            else:
+                headers = ''
 
         return f'{self._scheme}:{userinfo}{self.hostport}{params}{headers}'
 
@@ -259,10 +371,12 @@ class URI:
         return hash(str(self))
 
     def __copy__(self):
-        return URI.build(
+        new = URI.build(
             scheme=self._scheme,
             userinfo=self._userinfo,
             hostport=self._hostport,
             parameters=self._parameters,
             headers=self._headers,
         )
+        new._userinfo_forms = self._userinfo_forms
+        return new
@@ -1,6 +1,5 @@
 '''Parsing for SIP URIs.'''
 from collections import namedtuple
-from multidict import MultiDict
 import re
 
 
@@ -21,11 +20,153 @@ uri_re = re.compile(r'(?P<scheme>[^:]+):'
                     )
 
 
-def parse_uri(uri):
-    '''Parse a SIP URI into the scheme/userinfo/hostport/parameters/headers.'''
+UserinfoForms = namedtuple('UserinfoForms', (
+    'userinfo',
+    'user',
+    'password',
+    'escaped_user',
+    'escaped_password',
+))
+
+
+# characters allowed unescaped in the user and password (RFC 3261 25.1),
+# beyond the alphanumerics and `-_.~` that quote() always leaves alone
+USER_SAFE = "!*'()&=+$,;?/"
+PASSWORD_SAFE = "!*'()&=+$,"
+
+user_re = re.compile(r"[A-Za-z0-9\-_.!~*'()&=+$,;?/]*")
+password_re = re.compile(r"[A-Za-z0-9\-_.!~*'()&=+$,]*")
+
+# only escaped unreserved characters are equivalent to the characters
+# themselves (RFC 3261 19.1.4); any other escape is kept
+UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+                       "0123456789-_.!~*'()")
+escaped_token_re = re.compile(r'%([0-9A-Fa-f]{2})|[^%]+')
+bad_escape_re = re.compile(r'%(?![0-9A-Fa-f]{2})')
+
+
+# multidict and urllib.parse are only needed for URIs with headers or
+# escapes, so they're imported on first use to keep `import ursine` cheap
+def new_multidict(pairs=()):
+    '''Create a MultiDict, importing multidict on first use.'''
+    from multidict import MultiDict
+    return MultiDict(pairs)
+
+
+def escape_user(user):
+    '''Escape a plain text user for use in a URI.'''
+    if user_re.fullmatch(user):
+        return user
+    from urllib.parse import quote
+    return quote(user, safe=USER_SAFE)
+
+
+def escape_password(password):
+    '''Escape a plain text password for use in a URI.'''
+    if password_re.fullmatch(password):
+        return password
+    from urllib.parse import quote
+    return quote(password, safe=PASSWORD_SAFE)
+
+
+def canonical_escape(escaped, safe):
+    '''Get the canonical form of an already escaped user or password.
+
+    Escaped unreserved characters are decoded, other escapes are kept
+    with uppercase hex, and characters that should have been escaped
+    are. `escaped` must not contain malformed escapes.
+    '''
+    from urllib.parse import quote
+
+    def canonical(match):
+        hex_digits = match.group(1)
+        if hex_digits is None:
+            return quote(match.group(), safe=safe)
+        char = chr(int(hex_digits, 16))
+        return char if char in UNRESERVED else f'%{hex_digits.upper()}'
+    return escaped_token_re.sub(canonical, escaped)
+
+
+def parse_userinfo(userinfo):
+    '''Get the plain and canonically escaped forms of a userinfo.
+
+    Escapes are decoded for the plain forms. The escaped forms are
+    canonicalized by `canonical_escape`, so equivalent spellings of the
+    same user compare equal while escaped reserved characters (eg.
+    `%2B`) stay distinct from unescaped ones. A userinfo without `%`
+    that needs no escaping is returned as is.
+    '''
+    if not userinfo:
+        return UserinfoForms(userinfo, userinfo, None, userinfo, None)
+    user, colon, password = userinfo.partition(':')
+    if colon:
+        if '%' not in password and password_re.fullmatch(password):
+            escaped_password = password
+        else:
+            from urllib.parse import unquote
+            escaped_password = canonical_escape(password, PASSWORD_SAFE)
+            password = unquote(password)
+    else:
+        password = escaped_password = None
+    if '%' not in user and user_re.fullmatch(user):
+        escaped_user = user
+    else:
+        from urllib.parse import unquote
+        escaped_user = canonical_escape(user, USER_SAFE)
+        user = unquote(user)
+    return UserinfoForms(userinfo, user, password,
+                         escaped_user, escaped_password)
+
+
+control_re = re.compile(r'[\x00-\x1f\x7f]')
+delimiter_re = re.compile(r'[;?]')
+
+
+def prefilter_uri(uri):
+    '''Cheaply check whether `uri` could possibly be a SIP URI.
+
+    This only looks for structural problems (a scheme other than
+    `sip`/`sips`, control characters, no room for a host) with
+    str methods and precompiled searches, so garbage can be turned
+    away before any parsing. It never rejects a string that `URI`
+    would accept, but passing it doesn't make a string valid.
+    '''
+    if uri.startswith('sip:'):
+        start = 4
+    elif uri.startswith('sips:'):
+        start = 5
+    else:
+        return False
+    if control_re.search(uri) is not None:
+        return False
+    at = uri.find('@', start)
+    if at > start and at + 1 < len(uri) and uri[at + 1] not in ';?':
+        # userinfo@hostport
+        return uri[at + 1] != ':'
+    if start == len(uri) or uri[start] in ';?:@':
+        return False
+    # without userinfo, an `@` has to come after the hostport
+    return at == -1 or delimiter_re.search(uri, start, at) is not None
+
+
+# errors from `_parse_uri`, formatted with the URI only when raised, so
+# the non-raising path never pays for building a message
+INVALID_URI = "'{uri}' is not a valid SIP URI"
+CONTROL_CHARACTERS = 'SIP URIs cannot contain control characters'
+INVALID_PARAMETERS = 'parameters must be formatted as `key[=val]`'
+INVALID_HEADERS = 'headers must be formatted as `key=[val]`'
+
+
+def _parse_uri(uri):
+    '''Parse a SIP URI without raising, returning (result, error).
+
+    The error is one of the constant messages above, unformatted.
+    '''
     match = uri_re.match(uri)
     if not match:
-        raise ValueError(f"'{uri}' is not a valid SIP URI")
+        return None, INVALID_URI
+    if control_re.search(uri) is not None:
+        return None, CONTROL_CHARACTERS
     groups = match.groupdict()
 
     scheme = groups.get('scheme')
@@ -38,22 +179,20 @@ def parse_uri(uri):
     else:
         param_pairs = []
     for pair in param_pairs:
-        param = pair.split('=')
-        if len(param) != 2:
-            raise ValueError('parameters must be formatted as `key=[val]`')
-        key, val = param
-        parameters[key] = val
+        key, eq, val = pair.partition('=')
+        if not key or '=' in val:
+            return None, INVALID_PARAMETERS
+        # valueless parameters such as `lr` are kept with a value of None
+        parameters[key] = val if eq else None
 
-    headers = MultiDict()
+    # None rather than an empty MultiDict, as most URIs have no headers
+    headers = None
     if groups.get('headers'):
         header_pairs = groups.get('headers').split('&')
-    else:
-        header_pairs = []
-    for pair in header_pairs:
-        if len(pair.split('=')) != 2:
-            raise ValueError('headers must be formatted as `key=[val]`')
-        key, val = pair.split('=')
-        headers.add(key, val)
+        for pair in header_pairs:
+            if len(pair.split('=')) != 2:
+                return None, INVALID_HEADERS
+        headers = new_multidict(pair.split('=') for pair in header_pairs)
 
     return URIParseResult(
         scheme=scheme,
@@ -61,4 +200,12 @@ def parse_uri(uri):
         hostport=hostport,
         parameters=parameters,
         headers=headers,
-    )
+    ), None
+
+
+def parse_uri(uri):
+    '''Parse a SIP URI into the scheme/userinfo/hostport/parameters/headers.'''
+    result, error = _parse_uri(uri)
+    if error:
+        raise ValueError(error.format(uri=uri))
+    return result
@@ -0,0 +1,240 @@
+import copy
+import typing as t
+from .via_parsing import parse_via, split_via_list
+
+
+BRANCH_MAGIC_COOKIE = 'z9hG4bK'
+
+
+class ViaError(Exception):
+    pass
+
+
+class Via:
+    '''A single SIP Via value.'''
+    __slots__ = (
+        '_protocol',
+        '_transport',
+        '_sent_by',
+        '_parameters',
+    )
+
+    def __init__(self, via: str):
+        result = parse_via(via)
+        self._protocol = result.protocol
+        self._transport = result.transport
+        self._sent_by = result.sent_by
+        self._parameters = result.parameters
+        self._validate()
+
+    @classmethod
+    def parse_list(cls, vias: str) -> t.List['Via']:
+        '''Parse a comma separated Via field value into Vias.'''
+        return [cls(via) for via in split_via_list(vias)]
+
+    @classmethod
+    def build(cls, *,
+              transport: str,
+              host: t.Optional[str]=None,
+              port: t.Optional[int]=None,
+              sent_by: t.Optional[str]=None,
+              parameters: t.Optional[t.Dict[str, t.Optional[str]]]=None,
+              branch: t.Optional[str]=None,
+              protocol: str='SIP/2.0',
+              ) -> 'Via':
+        '''Build a new Via from kwargs.
+
+        As with URI hostport, sent-by may be given whole or as
+        separate host and port.
+        '''
+        if not ((host or port) is None) ^ (sent_by is None):
+            raise ViaError('sent_by and host/port kwargs'
+                           ' are mutually exclusive, but at'
+                           ' least one of host or sent_by'
+                           ' must be given')
+        self = object.__new__(cls)
+        self._protocol = protocol.upper()
+        self._transport = transport.upper()
+        if sent_by:
+            self._sent_by = sent_by
+        elif port:
+            self._sent_by = f'{host}:{port}'
+        else:
+            self._sent_by = host
+        self._parameters = dict(parameters) if parameters else {}
+        if branch:
+            self._parameters['branch'] = branch
+        self._validate()
+        return self
+
+    protocol = property(lambda self: self._protocol)
+    transport = property(lambda self: self._transport)
+    sent_by = property(lambda self: self._sent_by)
+    parameters = property(lambda self: self._parameters)
+    branch = property(lambda self: self._parameters.get('branch', None))
+    received = property(lambda self: self._parameters.get('received', None))
+    maddr = property(lambda self: self._parameters.get('maddr', None))
+
+    @property
+    def rport(self) -> t.Optional[int]:
+        '''The rport value, or None if absent or requested but unset.
+
+        Use `'rport' in via.parameters` to check whether it was requested.
+        '''
+        rport = self._parameters.get('rport', None)
+        return int(rport) if rport else None
+
+    @property
+    def host(self):
+        if self._sent_by.startswith('['):
+            return self._sent_by[:self._sent_by.index(']') + 1]
+        return self._sent_by.partition(':')[0]
+
+    @property
+    def port(self):
+        port_part = self._sent_by[len(self.host):]
+        if port_part.startswith(':'):
+            return int(port_part[1:])
+        return self._default_port()
+
+    @property
+    def rfc3261_branch(self):
+        '''Whether the branch was generated per RFC 3261.'''
+        branch = self.branch
+        return bool(branch) and branch.startswith(BRANCH_MAGIC_COOKIE)
+
+    def _validate(self):
+        '''Ensure correctness of properties.'''
+        if not self._sent_by:
+            raise ViaError('sent-by is a required attribute')
+        try:
+            if self.port not in range(1, 2**16):
+                raise ViaError(f'invalid port {self.port}')
+        except ValueError:
+            raise ViaError(f'invalid port in sent-by: {self._sent_by}')
+        rport = self._parameters.get('rport', None)
+        if rport is not None and not rport.isdigit():
+            raise ViaError(f'invalid rport {rport}')
+
+    def _default_port(self):
+        '''Get the default port for the transport.'''
+        return 5061 if self._transport == 'TLS' else 5060
+
+    def with_transport(self, transport: str):
+        '''Create a new Via from `self` with a specific transport.'''
+        new = copy.copy(self)
+        new._transport = transport.upper()
+        new._validate()
+        return new
+
+    def with_sent_by(self, sent_by: str):
+        '''Create a new Via from `self` with a specific sent-by.'''
+        new = copy.copy(self)
+        new._sent_by = sent_by
+        new._validate()
+        return new
+
+    def with_parameters(self, parameters: t.Dict[str, t.Optional[str]]):
+        '''Create a new Via from `self` with specific parameters.'''
+        new = copy.copy(self)
+        new._parameters = parameters
+        new._validate()
+        return new
+
+    def _with_parameter(self, key, value):
+        new = copy.copy(self)
+        new._parameters[key] = value
+        new._validate()
+        return new
+
+    def with_branch(self, branch: str):
+        '''Create a new Via from `self` with a specific branch.'''
+        return self._with_parameter('branch', branch)
+
+    def with_received(self, received: str):
+        '''Create a new Via from `self` with a specific received.'''
+        return self._with_parameter('received', received)
+
+    def with_rport(self, rport: t.Optional[int]=None):
+        '''Create a new Via from `self` with rport set.
+
+        With no value, the resulting Via only requests symmetric
+        response routing (a valueless `;rport`).
+        '''
+        return self._with_parameter(
+            'rport', None if rport is None else str(rport))
+
+    def __str__(self):
+        param_pairs = ';'.join([k if v is None else f'{k}={v}'
+                                for k, v in sorted(self._parameters.items())])
+        params = f';{param_pairs}' if param_pairs else ''
+        return f'{self._protocol}/{self._transport} {self._sent_by}{params}'
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self})'
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __copy__(self):
+        new = object.__new__(self.__class__)
+        new._protocol = self._protocol
+        new._transport = self._transport
+        new._sent_by = self._sent_by
+        new._parameters = copy.copy(self._parameters)
+        return new
+
+
+class TransactionIndex:
+    '''Transaction lookup per RFC 3261 §17.1.3 and §17.2.3.
+
+    Transactions are keyed on the top Via's branch and sent-by together
+    with the request method. ACK is keyed as INVITE so that it finds the
+    INVITE server transaction it acknowledges. Only RFC 3261 branches
+    (starting with the magic cookie) can be indexed.
+    '''
+
+    def __init__(self):
+        self._transactions = {}
+
+    @staticmethod
+    def key(via: Via, method: str) -> t.Tuple[str, str, str]:
+        '''Get the key of the transaction a request/response belongs to.'''
+        branch = via.branch
+        if not branch or not branch.startswith(BRANCH_MAGIC_COOKIE):
+            raise ViaError(f'branch `{branch}` is not RFC 3261 compliant')
+        method = method.upper()
+        if method == 'ACK':
+            method = 'INVITE'
+        return (branch, via.sent_by.lower(), method)
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def __contains__(self, key):
+        return key in self._transactions
+
+    def add(self, via: Via, method: str, transaction: t.Any):
+        '''Index a transaction, returning its key.'''
+        key = self.key(via, method)
+        if key in self._transactions:
+            raise ViaError(f'transaction {key} already exists')
+        self._transactions[key] = transaction
+        return key
+
+    def match(self, via: Via, method: str) -> t.Any:
+        '''Find the transaction for a request or response, if any.
+
+        For responses `method` is the CSeq method.
+        '''
+        try:
+            return self._transactions.get(self.key(via, method))
+        except ViaError:
+            return None
+
+    def remove(self, key: t.Tuple[str, str, str]) -> t.Any:
+        '''Remove a transaction by key, returning it if present.'''
+        return self._transactions.pop(key, None)
@@ -0,0 +1,58 @@
+'''Parsing for SIP Via header values.'''
+from collections import namedtuple
+import re
+
+
+ViaParseResult = namedtuple('ViaParseResult', (
+    'protocol',
+    'transport',
+    'sent_by',
+    'parameters',
+))
+
+
+via_re = re.compile(r'\s*(?P<protocol>[^/\s]+\s*/\s*[^/\s]+)\s*/\s*'
+                    r'(?P<transport>[^\s]+)\s+'
+                    r'(?P<sent_by>[^;\s]+)\s*'
+                    r'(;(?P<parameters>.*))?$'
+                    )
+
+
+def parse_via_params(params_str):
+    '''Parse Via parameters, allowing valueless ones such as `rport`.'''
+    params = {}
+    for pair in params_str.split(';'):
+        pair = pair.strip()
+        if pair == '':
+            continue
+        key, eq, val = pair.partition('=')
+        key = key.strip()
+        if not key or (eq and not val.strip()):
+            raise ValueError(f'invalid via parameter `{pair}`')
+        params[key.lower()] = val.strip() if eq else None
+    return params
+
+
+def parse_via(via):
+    '''Parse a single Via value into protocol/transport/sent-by/parameters.
+
+    Ex `SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bK776;rport`
+    '''
+    match = via_re.match(via)
+    if not match:
+        raise ValueError(f"'{via}' is not a valid Via")
+    groups = match.groupdict()
+    protocol = ''.join(groups['protocol'].split()).upper()
+    parameters = groups.get('parameters')
+    return ViaParseResult(
+        protocol=protocol,
+        transport=groups['transport'].upper(),
+        sent_by=groups['sent_by'],
+        parameters=parse_via_params(parameters) if parameters else {},
+    )
+
+
+def split_via_list(vias):
+    '''Split a comma separated Via field value into single values.'''
+    return [via for via in (part.strip() for part in vias.split(','))
+            if via]